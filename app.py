@@ -4,6 +4,9 @@ from pathlib import Path
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 from datetime import datetime
 
 
@@ -17,6 +20,11 @@ DATA_DIR = Path("data/analysis")
 MODEL_DIR = Path("data/models")
 LATEST_FILE = DATA_DIR / "latest_dashboard.json"
 LATEST_FILE_MODEL = MODEL_DIR/ "latest_model_metrics.json"
+GEO_FILE = DATA_DIR / "geo_stats.json"
+HISTORY_FILE = DATA_DIR / "dashboard_history.parquet"
+SNAPSHOT_FILE = Path("data/snapshots/zimmo_listings.parquet")
+SNAPSHOT_COLUMNS = ["zimmo_code", "type", "sub_type", "price", "postcode", "city",
+                    "living_area_m2", "bedroom", "epc_kwh_m2", "url"]
 
 
 @st.cache_data(ttl=300)  
@@ -40,6 +48,53 @@ def load_data(type_data = "data"):
                 return json.load(f)
         return None
     
+
+@st.cache_data(ttl=300)
+def load_geo_stats():
+    if not GEO_FILE.exists():
+        return None
+    with open(GEO_FILE, "r") as f:
+        return json.load(f)
+
+
+@st.cache_data(max_entries=1)
+def load_history(path, mtime):
+    return pq.read_table(path).to_pandas().sort_values("timestamp")
+
+
+@st.cache_resource(max_entries=1)
+def load_snapshot(path, mtime):
+    """Read the listing snapshot once per file version, with compact dtypes shared by every session."""
+    table = pq.read_table(path, columns=SNAPSHOT_COLUMNS, memory_map=True)
+    for name in ("price", "living_area_m2", "epc_kwh_m2"):
+        table = table.set_column(table.schema.get_field_index(name), name,
+                                 table[name].cast(pa.float64()).cast(pa.float32()))
+    df = table.to_pandas(categories=["type", "sub_type", "postcode", "city"], self_destruct=True)
+    df["price_per_m2"] = (df["price"] / df["living_area_m2"].where(df["living_area_m2"] > 0)).astype("float32")
+    return df
+
+
+def get_snapshot():
+    if not SNAPSHOT_FILE.exists():
+        return None
+    return load_snapshot(str(SNAPSHOT_FILE), SNAPSHOT_FILE.stat().st_mtime)
+
+
+def filter_listings(df, types, postcodes, price_range, area_range, epc_range, include_unknown):
+    mask = np.ones(len(df), dtype=bool)
+    if types:
+        mask &= df["type"].isin(types).to_numpy()
+    if postcodes:
+        mask &= df["postcode"].isin(postcodes).to_numpy()
+    for column, (low, high) in (("price", price_range), ("living_area_m2", area_range), ("epc_kwh_m2", epc_range)):
+        values = df[column].to_numpy()
+        in_range = (values >= low) & (values <= high)
+        if include_unknown:
+            in_range |= np.isnan(values)
+        mask &= in_range
+    return df[mask]
+
+
 dashboard_data = load_data("data")
 
 if not dashboard_data:
@@ -96,7 +151,7 @@ with col4:
 
 st.divider()
 
-tabs = st.tabs(["🏘️ Property Overview", "💰 Price Analysis", "📍 Location Insights", "🤖 Model Performance"])
+tabs = st.tabs(["🏘️ Property Overview", "💰 Price Analysis", "📍 Location Insights", "🤖 Model Performance", "🔎 Explore Listings", "📈 Market Trends"])
 
 
 with tabs[0]:
@@ -147,9 +202,11 @@ with tabs[1]:
             
             fig = go.Figure()
             fig.add_trace(go.Box(
-                q1=[price_stats.get('min', 0)],
+                q1=[price_stats.get('p25', price_stats.get('min', 0))],
                 median=[price_stats.get('median', 0)],
-                q3=[price_stats.get('max', 0)],
+                q3=[price_stats.get('p75', price_stats.get('max', 0))],
+                lowerfence=[price_stats.get('min', 0)],
+                upperfence=[price_stats.get('max', 0)],
                 mean=[summary.get('avg_price', 0)],
                 name="Price Distribution",
                 boxmean=True
@@ -160,13 +217,14 @@ with tabs[1]:
         with col2:
             st.subheader("Price Metrics")
             metrics_df = pd.DataFrame({
-                "Metric": ["Minimum", "25th Percentile", "Median (50th)", "Mean (Average)", "75th Percentile", "Maximum", "Standard Deviation"],
+                "Metric": ["Minimum", "25th Percentile", "Median (50th)", "Mean (Average)", "75th Percentile", "90th Percentile", "Maximum", "Standard Deviation"],
                 "Price (€)": [
                     f"{price_stats.get('min', 0):,.0f}",
-                    "N/A", 
+                    f"{price_stats['p25']:,.0f}" if price_stats.get('p25') is not None else "N/A",
                     f"{price_stats.get('median', 0):,.0f}",
                     f"{summary.get('avg_price', 0):,.0f}",
-                    "N/A",  
+                    f"{price_stats['p75']:,.0f}" if price_stats.get('p75') is not None else "N/A",
+                    f"{price_stats['p90']:,.0f}" if price_stats.get('p90') is not None else "N/A",
                     f"{price_stats.get('max', 0):,.0f}",
                     f"{price_stats.get('std', 0):,.0f}"
                 ]
@@ -207,6 +265,29 @@ with tabs[2]:
     else:
         st.info("No location data available")
 
+    geo_stats = load_geo_stats()
+    if geo_stats and geo_stats.get("postcodes"):
+        st.subheader("Prices by Postcode")
+        level = st.radio("Level", ["Postcode", "Province"], horizontal=True)
+        geo_df = pd.DataFrame(geo_stats["postcodes"] if level == "Postcode" else geo_stats["provinces"])
+        geo_df = geo_df.dropna(subset=["lat", "lon"])
+        if not geo_df.empty:
+            fig = px.scatter_map(
+                geo_df,
+                lat="lat",
+                lon="lon",
+                size="count",
+                color="median_price_per_m2",
+                hover_name="postcode" if level == "Postcode" else "province",
+                hover_data={"count": True, "median_price": ":,.0f", "median_price_per_m2": ":,.0f", "lat": False, "lon": False},
+                color_continuous_scale="Viridis",
+                zoom=6.5,
+                center={"lat": 50.6, "lon": 4.6},
+                height=600
+            )
+            fig.update_layout(coloraxis_colorbar_title="Median €/m²")
+            st.plotly_chart(fig, use_container_width=True)
+
 
 with tabs[3]:
     st.header("Model Performance")
@@ -288,5 +369,85 @@ with tabs[3]:
         st.info("No model performance data available. Please run the model training task first.")
 
 
+with tabs[4]:
+    st.header("Explore Listings")
+
+    listings = get_snapshot()
+    if listings is None or listings.empty:
+        st.info("No listing snapshot available. Please run the export_snapshot task first.")
+    else:
+        def bounds(column, step):
+            values = listings[column].dropna()
+            if values.empty:
+                return 0.0, float(step)
+            low = float(np.floor(values.min() / step) * step)
+            high = float(np.ceil(values.max() / step) * step)
+            # st.slider raises when min == max, e.g. a single distinct value on a step boundary
+            return low, max(high, low + step)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            types = st.multiselect("Type", sorted(listings["type"].cat.categories))
+            postcodes = st.multiselect("Postcode", sorted(listings["postcode"].cat.categories))
+            include_unknown = st.checkbox("Include listings with unknown values", value=True)
+        with col2:
+            price_min, price_max = bounds("price", 10000)
+            price_range = st.slider("Price (€)", price_min, price_max, (price_min, price_max), step=10000.0)
+            area_min, area_max = bounds("living_area_m2", 10)
+            area_range = st.slider("Living area (m²)", area_min, area_max, (area_min, area_max), step=10.0)
+            epc_min, epc_max = bounds("epc_kwh_m2", 10)
+            epc_range = st.slider("EPC (kWh/m²)", epc_min, epc_max, (epc_min, epc_max), step=10.0)
+
+        filtered = filter_listings(listings, types, postcodes, price_range, area_range, epc_range, include_unknown)
+        prices = filtered["price"].dropna().to_numpy()
+
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("🏠 Listings", f"{len(filtered):,}")
+        if len(prices):
+            p25, median, p75 = np.percentile(prices, [25, 50, 75])
+            col2.metric("💰 Median Price", f"€{median:,.0f}")
+            col3.metric("📏 Interquartile Range", f"€{p25:,.0f} - €{p75:,.0f}")
+            price_per_m2 = filtered["price_per_m2"].dropna()
+            col4.metric("📐 Median €/m²", f"€{price_per_m2.median():,.0f}" if len(price_per_m2) else "N/A")
+
+            counts, edges = np.histogram(prices, bins=50)
+            fig = px.bar(x=edges[:-1], y=counts, title="Price Distribution")
+            fig.update_layout(xaxis_title="Price (€)", yaxis_title="Number of Properties", bargap=0)
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("No listings match these filters")
+
+        st.dataframe(filtered.head(500), hide_index=True, use_container_width=True)
+
+
+with tabs[5]:
+    st.header("Market Trends")
+
+    if not HISTORY_FILE.exists():
+        st.info("No dashboard history available yet. It grows with every pipeline run.")
+    else:
+        history = load_history(str(HISTORY_FILE), HISTORY_FILE.stat().st_mtime)
+        price_columns = [col for col in ["p25_price", "median_price", "avg_price", "p75_price"]
+                         if col in history and history[col].notna().any()]
+
+        col1, col2 = st.columns(2)
+        with col1:
+            fig = px.line(history, x="timestamp", y=price_columns, title="Asking Prices Over Time")
+            fig.update_layout(xaxis_title="Date", yaxis_title="Price (€)", legend_title="")
+            st.plotly_chart(fig, use_container_width=True)
+        with col2:
+            count_columns = [col for col in history.columns if col.startswith("count_")]
+            fig = px.line(history, x="timestamp", y=["total_properties"] + count_columns, title="Listings Over Time")
+            fig.update_layout(xaxis_title="Date", yaxis_title="Number of Properties", legend_title="")
+            st.plotly_chart(fig, use_container_width=True)
+
+        if "median_price_per_m2" in history and history["median_price_per_m2"].notna().any():
+            fig = px.line(history, x="timestamp", y="median_price_per_m2", title="Median Price per m² Over Time")
+            fig.update_layout(xaxis_title="Date", yaxis_title="€/m²")
+            st.plotly_chart(fig, use_container_width=True)
+
+        weekly = int((history["granularity"] == "weekly").sum())
+        st.caption(f"{len(history)} points: {len(history) - weekly} daily, {weekly} weekly")
+
 st.divider()
 st.caption("📊 Immo-Eliza Dashboard | Powered by Airflow Pipeline | Data updates automatically every pipeline run")
\ No newline at end of file
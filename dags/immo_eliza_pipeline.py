@@ -10,6 +10,7 @@ import os
 sys.path.insert(0, "/opt/airflow/scripts")
 sys.path.insert(0, "/opt/airflow/plugins")
 from utils.output import Output  
+from utils.config import SCRAPE_CATEGORIES, SCRAPE_POOL
 
 
 try:
@@ -57,52 +58,93 @@ def check_dependencies(**context):
     print("✅ All dependencies available")
     return "All dependencies available"
 
-def scrape_apartments_task(**context):
+def plan_price_ranges_task(**context):
     if not SCRAPER_AVAILABLE:
         raise Exception("PropertyScraper not available")
     
-    scraper = PropertyScraper(category_type="APARTMENT")
+    plan = []
+    for category_type in SCRAPE_CATEGORIES:
+        scraper = PropertyScraper(category_type=category_type, run_key=context['run_id'])
+        try:
+            plan.extend(scraper.plan_price_ranges())
+        finally:
+            scraper.cleanup()
     
-    try:
-        summary = scraper.scrape_all_price_ranges()
-        context['task_instance'].xcom_push(key='apartments_count', value=summary['total_properties'])  
-        context['task_instance'].xcom_push(key='apartments_price_ranges_scraped', value=summary['price_ranges_scraped'])
-        context['task_instance'].xcom_push(key='duration', value=summary['duration'])
-        
-        return summary['total_properties']
-    finally:
-        scraper.cleanup()
+    print(f"📐 Planned {len(plan)} price range tasks")
+    return plan
 
-def scrape_houses_task(**context):
+def scrape_price_range_task(category_type, range_key, url, min_price=None, max_price=None, **context):
     if not SCRAPER_AVAILABLE:
         raise Exception("PropertyScraper not available")
     
-    scraper = PropertyScraper(category_type="HOUSE")
+    scraper = PropertyScraper(category_type=category_type, run_key=context['run_id'])
     
     try:
-        summary = scraper.scrape_all_price_ranges()
-        context['task_instance'].xcom_push(key='houses_count', value=summary['total_properties'])
-        context['task_instance'].xcom_push(key='houses_price_ranges_scraped', value=summary['price_ranges_scraped'])
-        context['task_instance'].xcom_push(key='duration', value=summary['duration'])
-        
-        return summary['total_properties']
+        return scraper.scrape_single_range(range_key, url)
     finally:
         scraper.cleanup()
 
+def summarize_scrape_task(**context):
+    ti = context['task_instance']
+    plan = ti.xcom_pull(task_ids='plan_price_ranges') or []
+    pulled = ti.xcom_pull(task_ids='scrape_price_range', map_indexes=list(range(len(plan)))) if plan else []
+    results = [result for result in (pulled or []) if result]
+    summaries = PropertyScraper.summarize_ranges(plan, results)
+    
+    for category_type, summary in summaries.items():
+        scraper = PropertyScraper(category_type=category_type, run_key=context['run_id'])
+        scraper.setup()
+        scraper.record_result_counts(plan, results)
+        
+        if summary['failed_price_ranges']:
+            print(f"⚠️ {category_type}: {len(summary['failed_price_ranges'])} price ranges failed: {summary['failed_price_ranges']}")
+        if summary['total_properties'] == 0:
+            print(f"⚠️  No properties found from zimmo.be for {category_type}, triggering fallback...")
+            scraper.run_fallback(summary)
+        
+        scraper.output.save_summary_to_db(summary)
+        print(scraper.get_summary_report(summary))
+        ti.xcom_push(key=f'{category_type.lower()}_count', value=summary['total_properties'])
+    
+    return sum(summary['total_properties'] for summary in summaries.values())
+
 def deduplicate_task(**context):
+    from utils.output import Output
+    from utils.deduplicator import NearDuplicateDetector
+    output = Output(postgres_conn_id='postgres_default')
+    duplicates = NearDuplicateDetector(output).run()
+    return f"Deduplication complete: {duplicates} listings marked as duplicates"
+
+def refresh_stats_views_task(**context):
     from utils.output import Output
     output = Output(postgres_conn_id='postgres_default')
-    output.deduplicate(unique_col="zimmo_code")
-    return "Deduplication complete"
+    views = output.refresh_stats_views()
+    return f"Refreshed {views} statistics views"
+
+def export_snapshot_task(**context):
+    from utils.output import Output
+    from utils.snapshot import export_snapshot
+    output = Output(postgres_conn_id='postgres_default')
+    rows = export_snapshot(output)
+    return f"Snapshot exported with {rows} rows"
+
+def aggregate_geo_stats_task(**context):
+    from utils.geo import GeoAggregator
+    from utils.snapshot import read_snapshot
+    listings = read_snapshot(columns=["postcode", "city", "price", "living_area_m2"])
+    postcodes = GeoAggregator().run(listings)
+    return f"Geo statistics computed for {postcodes} postcodes"
 
 def final_summary_task(**context):
     from utils.output import Output
     output = Output(postgres_conn_id='postgres_default')
     
     try:
-        df = output.read_db() 
-        total_properties = len(df)
+        total_properties = output.count(table_name='zimmo_listings')
         print(f"📊 Total properties in DB after deduplication: {total_properties}")
+        by_type = output.read_db(table_name='zimmo_stats_type', order_by='listings DESC')
+        for row in by_type.itertuples():
+            print(f"  - {row.type} / {row.sub_type}: {row.listings} listings, median €{row.median_price or 0:,.0f}")
         return f"Pipeline completed successfully with {total_properties} properties processed!"
     except Exception as e:
         print(f"Error in final_summary_task: {e}")
@@ -143,20 +185,25 @@ check_deps = PythonOperator(
     retry_delay=timedelta(minutes=1)
 )
 
-scrape_apartments = PythonOperator(
-    task_id='scrape_apartments',
-    python_callable=scrape_apartments_task,
-    dag=dag,
-    
-
+plan_price_ranges = PythonOperator(
+    task_id='plan_price_ranges',
+    python_callable=plan_price_ranges_task,
+    dag=dag
 )
 
-scrape_houses = PythonOperator(
-    task_id='scrape_houses',
-    python_callable=scrape_houses_task,
-    dag=dag,
+scrape_price_range = PythonOperator.partial(
+    task_id='scrape_price_range',
+    python_callable=scrape_price_range_task,
+    pool=SCRAPE_POOL,
+    map_index_template="{{ task.op_kwargs['category_type'] }} {{ task.op_kwargs['range_key'] }}",
+    dag=dag
+).expand(op_kwargs=plan_price_ranges.output)
 
- 
+summarize_scrape = PythonOperator(
+    task_id='summarize_scrape',
+    python_callable=summarize_scrape_task,
+    trigger_rule='all_done',
+    dag=dag
 )
 
 deduplicate_data = PythonOperator(
@@ -165,6 +212,24 @@ deduplicate_data = PythonOperator(
     dag=dag
 )
 
+refresh_stats_views = PythonOperator(
+    task_id='refresh_stats_views',
+    python_callable=refresh_stats_views_task,
+    dag=dag
+)
+
+export_snapshot = PythonOperator(
+    task_id='export_snapshot',
+    python_callable=export_snapshot_task,
+    dag=dag
+)
+
+aggregate_geo_stats = PythonOperator(
+    task_id='aggregate_geo_stats',
+    python_callable=aggregate_geo_stats_task,
+    dag=dag
+)
+
 final_summary = PythonOperator(
     task_id='final_summary', 
     python_callable=final_summary_task, 
@@ -175,8 +240,10 @@ end_task = EmptyOperator(task_id='end_pipeline', dag=dag)
 
 
 start_task >> check_deps
-check_deps >> scrape_apartments >> scrape_houses
-scrape_houses >> deduplicate_data
-deduplicate_data >> [train_model, generate_dashboard]
-[train_model, generate_dashboard] >> final_summary
+check_deps >> plan_price_ranges >> scrape_price_range >> summarize_scrape
+summarize_scrape >> deduplicate_data
+deduplicate_data >> [refresh_stats_views, export_snapshot]
+export_snapshot >> [train_model, generate_dashboard, aggregate_geo_stats]
+refresh_stats_views >> generate_dashboard
+[train_model, generate_dashboard, aggregate_geo_stats] >> final_summary
 final_summary >> end_task
@@ -0,0 +1,133 @@
+import asyncio
+import random
+from concurrent.futures import ThreadPoolExecutor
+import certifi
+import httpx
+from utils.rate_limiter import RateLimiter
+from utils.response_cache import CachedResponse
+from utils.config import FETCH_CONCURRENCY, FETCH_TIMEOUT, FETCH_MAX_RETRIES
+
+
+class AsyncFetcher:
+    """Fetches detail pages concurrently on one event loop and one shared connection pool."""
+
+    def __init__(self, headers=None, cookie_source=None, concurrency=FETCH_CONCURRENCY,
+                 rate_limiter=None, cache=None):
+        self.concurrency = concurrency
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.cache = cache
+        self.headers = headers or {}
+        self.cookie_source = cookie_source
+        self.cookie_session = None
+        self.loop = asyncio.new_event_loop()
+        self.loop.set_default_executor(ThreadPoolExecutor(max_workers=concurrency * 2 + 4))
+        self.client = None
+        self.semaphore = None
+
+    def _ensure_client(self):
+        if self.client is None:
+            cookies = None
+            headers = dict(self.headers)
+            if self.cookie_source:
+                self.cookie_session, cookies, user_agent = self.cookie_source()
+                if user_agent:
+                    headers['User-Agent'] = user_agent
+            self.client = httpx.AsyncClient(
+                headers=headers,
+                cookies=cookies,
+                timeout=FETCH_TIMEOUT,
+                follow_redirects=True,
+                verify=certifi.where(),
+                limits=httpx.Limits(
+                    max_connections=self.concurrency,
+                    max_keepalive_connections=self.concurrency
+                )
+            )
+            self.semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def fetch(self, url, headers=None):
+        headers = dict(headers or {})
+        if self.cache is not None:
+            headers.update(await asyncio.to_thread(self.cache.conditional_headers, url))
+
+        async with self.semaphore:
+            for attempt in range(FETCH_MAX_RETRIES):
+                try:
+                    await self.rate_limiter.acquire_async(url)
+                    response = await self.client.get(url, headers=headers)
+
+                    if response.status_code in (200, 304) and self.cache is not None:
+                        cached = await asyncio.to_thread(
+                            self.cache.store, url, response.status_code, response.headers, response.content
+                        )
+                        if cached is not None:
+                            return cached
+                    if response.status_code == 200:
+                        return CachedResponse(response.content, None, False)
+                    elif response.status_code == 403:
+                        print(f"🚫 403 Forbidden on attempt {attempt + 1} for {url}")
+                        if attempt < FETCH_MAX_RETRIES - 1:
+                            blocked = self.cookie_session
+                            await asyncio.sleep(random.uniform(5, 10))
+                            if self.cookie_source:
+                                self.cookie_session, self.client.cookies, user_agent = await asyncio.to_thread(
+                                    self.cookie_source, blocked
+                                )
+                                if user_agent:
+                                    self.client.headers['User-Agent'] = user_agent
+                            continue
+                    else:
+                        print(f"{response.status_code} : ❌ Failed to fetch {url}")
+                        headers.pop("If-None-Match", None)
+                        headers.pop("If-Modified-Since", None)
+                        if attempt < FETCH_MAX_RETRIES - 1:
+                            await asyncio.sleep(random.uniform(3, 6))
+                            continue
+
+                except httpx.HTTPError as e:
+                    print(f"🔌 Connection error on attempt {attempt + 1} for {url}: {e}")
+                    if attempt < FETCH_MAX_RETRIES - 1:
+                        await asyncio.sleep(random.uniform(5, 10))
+                        continue
+
+            print(f"❌ Failed to fetch {url} after {FETCH_MAX_RETRIES} attempts")
+            return None
+
+    async def _fetch_all(self, urls, headers_factory=None):
+        tasks = [
+            self.fetch(url, headers_factory() if headers_factory else None)
+            for url in urls
+        ]
+        return await asyncio.gather(*tasks)
+
+    def fetch_all(self, urls, headers_factory=None):
+        if not urls:
+            return []
+        self._ensure_client()
+        return self.loop.run_until_complete(self._fetch_all(urls, headers_factory))
+
+    async def _stream_worker(self, receive, emit, headers_factory=None):
+        while True:
+            item = await asyncio.to_thread(receive)
+            if item is None:
+                return
+            url, tag = item
+            response = await self.fetch(url, headers_factory() if headers_factory else None)
+            await asyncio.to_thread(emit, tag, response)
+
+    async def _stream(self, receive, emit, headers_factory=None):
+        await asyncio.gather(*(
+            self._stream_worker(receive, emit, headers_factory) for _ in range(self.concurrency)
+        ))
+
+    def stream(self, receive, emit, headers_factory=None):
+        """Fetch URLs as receive() yields (url, tag) until it returns None, passing each response to emit(tag, response)."""
+        self._ensure_client()
+        self.loop.run_until_complete(self._stream(receive, emit, headers_factory))
+
+    def close(self):
+        if self.client is not None:
+            self.loop.run_until_complete(self.client.aclose())
+            self.client = None
+        if not self.loop.is_closed():
+            self.loop.close()
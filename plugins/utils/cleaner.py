@@ -1,4 +1,7 @@
+import hashlib
+import json
 import re
+from utils.config import FINGERPRINT_KEYS
 
 class Cleaner:
     @staticmethod
@@ -63,6 +66,11 @@ class Cleaner:
                 data[key] = None
         return data 
     
+    @staticmethod
+    def fingerprint(data):
+        values = [None if data.get(key) is None else str(data.get(key)) for key in FINGERPRINT_KEYS]
+        return hashlib.md5(json.dumps(values).encode()).hexdigest()
+    
     @staticmethod
     def clean_year(year_value):
         if not year_value:
@@ -0,0 +1,86 @@
+import threading
+from datetime import datetime
+from utils.config import CRAWL_FRONTIER_RETENTION_DAYS
+
+
+class CrawlFrontier:
+    """Durable record of the price ranges, search pages and detail URLs of one crawl run.
+
+    Rows are keyed by run_key, so a retried task with the same key skips the
+    ranges it finished, resumes each range after its last finished page and
+    does not fetch detail pages again.
+    """
+
+    def __init__(self, output, category_type, run_key=None, retention_days=CRAWL_FRONTIER_RETENTION_DAYS):
+        self.output = output
+        self.category_type = category_type
+        self.run_key = run_key or f"manual__{datetime.now().isoformat()}"
+        self.retention_days = retention_days
+        self.lock = threading.Lock()
+        self.ranges = {}
+        self.pages = {}
+        self.details = set()
+
+    def load(self):
+        self.output.prune_frontier(self.category_type, self.retention_days)
+        self.ranges, self.pages, self.details = {}, {}, set()
+        for kind, url, price_range, page, status, properties in self.output.get_frontier(self.run_key, self.category_type):
+            if kind == "range":
+                self.ranges[price_range] = {"url": url, "status": status, "properties": properties or 0}
+            elif kind == "page" and status == "done":
+                self.pages.setdefault(price_range, {})[page] = properties or 0
+            elif kind == "detail" and status == "done":
+                self.details.add(url)
+        if self.ranges:
+            done = sum(1 for state in self.ranges.values() if state["status"] == "done")
+            print(f"🧭 Resuming run {self.run_key}: {done}/{len(self.ranges)} price ranges done, "
+                  f"{len(self.details)} detail pages done")
+        return self
+
+    def get_ranges(self):
+        return {key: state["url"] for key, state in self.ranges.items()}
+
+    def add_ranges(self, base_url):
+        rows = []
+        with self.lock:
+            for key, url in base_url.items():
+                if key not in self.ranges:
+                    self.ranges[key] = {"url": url, "status": "pending", "properties": 0}
+                    rows.append(("range", url, key, None, "pending", 0))
+        self.output.save_frontier(self.run_key, self.category_type, rows)
+
+    def is_range_done(self, key):
+        return self.ranges.get(key, {}).get("status") == "done"
+
+    def range_properties(self, key):
+        return self.ranges.get(key, {}).get("properties", 0)
+
+    def resume_page(self, key):
+        pages = self.pages.get(key)
+        return max(pages) + 1 if pages else 1
+
+    def resumed_properties(self, key):
+        return sum(self.pages.get(key, {}).values())
+
+    def finish_page(self, key, url, page, properties):
+        with self.lock:
+            self.pages.setdefault(key, {})[page] = properties
+        self.output.save_frontier(self.run_key, self.category_type, [("page", url, key, page, "done", properties)])
+
+    def finish_range(self, key, properties, status="done"):
+        with self.lock:
+            state = self.ranges.setdefault(key, {"url": "", "status": status, "properties": 0})
+            state["status"] = status
+            state["properties"] = properties
+            url = state["url"]
+        self.output.save_frontier(self.run_key, self.category_type, [("range", url, key, None, status, properties)])
+
+    def is_detail_done(self, url):
+        return url in self.details
+
+    def finish_details(self, key, done_urls, failed_urls=()):
+        rows = [("detail", url, key, None, "done", 0) for url in done_urls]
+        rows += [("detail", url, key, None, "failed", 0) for url in failed_urls]
+        with self.lock:
+            self.details.update(done_urls)
+        self.output.save_frontier(self.run_key, self.category_type, rows)
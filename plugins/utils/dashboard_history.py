@@ -0,0 +1,107 @@
+import json
+import os
+import re
+from datetime import datetime, timedelta
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from utils.config import (
+    DASHBOARD_HISTORY_PATH, DASHBOARD_HISTORY_DAILY_DAYS, DASHBOARD_HISTORY_RETENTION_DAYS, SNAPSHOT_COMPRESSION
+)
+
+
+def flatten_dashboard(dashboard_data):
+    summary = dashboard_data.get("summary", {})
+    prices = dashboard_data.get("price_statistics", {})
+    row = {
+        "timestamp": pd.Timestamp(summary.get("timestamp") or datetime.now()).tz_localize(None),
+        "samples": 1,
+        "total_properties": summary.get("total_properties"),
+        "avg_price": summary.get("avg_price"),
+        "min_price": prices.get("min"),
+        "max_price": prices.get("max"),
+        "median_price": prices.get("median"),
+        "std_price": prices.get("std"),
+        "p25_price": prices.get("p25"),
+        "p75_price": prices.get("p75"),
+        "p90_price": prices.get("p90"),
+        "median_price_per_m2": dashboard_data.get("price_per_m2_statistics", {}).get("p50"),
+        "model_test_r2": dashboard_data.get("model_prediction", {}).get("test_r2"),
+    }
+    for property_type, count in (summary.get("property_types") or {}).items():
+        row[f"count_{re.sub(r'[^a-z0-9]+', '_', str(property_type).lower())}"] = count
+    return row
+
+
+class DashboardHistory:
+    """One Parquet file holding a row of headline metrics per dashboard run.
+
+    Every append compacts the series: the last run of each day is kept for
+    the most recent DASHBOARD_HISTORY_DAILY_DAYS, older days are folded into
+    weekly means weighted by their sample counts, and rows older than
+    DASHBOARD_HISTORY_RETENTION_DAYS are dropped. The file is replaced
+    atomically, so readers always see a complete series.
+    """
+
+    def __init__(self, path=DASHBOARD_HISTORY_PATH, daily_days=DASHBOARD_HISTORY_DAILY_DAYS,
+                 retention_days=DASHBOARD_HISTORY_RETENTION_DAYS):
+        self.path = path
+        self.daily_days = daily_days
+        self.retention_days = retention_days
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return pd.DataFrame()
+        return pq.read_table(self.path).to_pandas()
+
+    def seed(self, json_files):
+        rows = []
+        for json_file in json_files:
+            try:
+                with open(json_file) as f:
+                    rows.append(flatten_dashboard(json.load(f)))
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Skipping unreadable dashboard file {json_file}: {e}")
+        return rows
+
+    def compact(self, df, now=None):
+        now = pd.Timestamp(now or datetime.now())
+        if "granularity" not in df:
+            df = df.assign(granularity="daily")
+        df = df.assign(granularity=df["granularity"].fillna("daily"), samples=df["samples"].fillna(1))
+        df = df[df["timestamp"] >= now - timedelta(days=self.retention_days)].sort_values("timestamp")
+        metrics = [col for col in df.columns if col not in ("timestamp", "granularity", "samples")]
+
+        daily = df[df["granularity"] == "daily"]
+        daily = daily.groupby(daily["timestamp"].dt.floor("D"), as_index=False).last()
+        cutoff = (now - timedelta(days=self.daily_days)).floor("D")
+        recent = daily[daily["timestamp"] >= cutoff]
+        old = pd.concat([df[df["granularity"] == "weekly"], daily[daily["timestamp"] < cutoff]])
+
+        if not old.empty:
+            week = old["timestamp"].dt.to_period("W").dt.start_time
+            values = old[metrics].apply(pd.to_numeric, errors="coerce")
+            weights = values.notna().mul(old["samples"], axis=0)
+            weekly = (values.mul(old["samples"], axis=0).groupby(week).sum(min_count=1)
+                      / weights.groupby(week).sum().replace(0, float("nan")))
+            weekly["samples"] = old["samples"].groupby(week).sum()
+            weekly["granularity"] = "weekly"
+            recent = pd.concat([weekly.rename_axis("timestamp").reset_index(), recent], ignore_index=True)
+        return recent[["timestamp", "granularity", "samples"] + metrics].reset_index(drop=True)
+
+    def save(self, df):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_path, compression=SNAPSHOT_COMPRESSION)
+        os.replace(tmp_path, self.path)
+
+    def append(self, dashboard_data, seed_files=()):
+        history = self.load()
+        rows = [flatten_dashboard(dashboard_data)]
+        if history.empty and seed_files:
+            rows = self.seed(seed_files) + rows
+        df = pd.concat([history, pd.DataFrame(rows)], ignore_index=True)
+        df = self.compact(df)
+        self.save(df)
+        print(f"📈 Dashboard history now holds {len(df)} points in {self.path}")
+        return len(df)
@@ -0,0 +1,108 @@
+import os
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlparse
+import pandas as pd
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+from utils.config import DB_CONN_ID, DB_POOL_MIN, DB_POOL_MAX, DB_STATEMENT_TIMEOUT_MS
+
+
+def get_connection_params(conn_id=DB_CONN_ID):
+    try:
+        from airflow.models import Connection
+        conn = Connection.get_connection_from_secrets(conn_id)
+        
+        return {
+            'host': conn.host,
+            'port': conn.port or 5432,
+            'database': conn.schema,
+            'user': conn.login,
+            'password': conn.password
+        }
+    except Exception as e:
+        print(f"Error getting Airflow connection: {e}")
+        uri = os.getenv(f"AIRFLOW_CONN_{conn_id.upper()}")
+        if not uri:
+            raise RuntimeError(f"AIRFLOW_CONN_{conn_id.upper()} not set")
+        
+        parsed = urlparse(uri)
+        return {
+            'host': parsed.hostname,
+            'port': parsed.port or 5432,
+            'database': parsed.path.lstrip('/'),
+            'user': parsed.username,
+            'password': parsed.password
+        }
+
+
+class ConnectionPool:
+    """Process-wide pool of Postgres connections, safe to share between threads.
+
+    Callers block when all DB_POOL_MAX connections are leased, and every
+    connection runs with a DB_STATEMENT_TIMEOUT_MS statement timeout.
+    """
+
+    _shared_pools = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, conn_id=DB_CONN_ID, minconn=DB_POOL_MIN, maxconn=DB_POOL_MAX,
+                 statement_timeout=DB_STATEMENT_TIMEOUT_MS):
+        params = get_connection_params(conn_id)
+        self.pool = ThreadedConnectionPool(
+            minconn, maxconn,
+            host=params['host'],
+            port=params['port'],
+            dbname=params['database'],
+            user=params['user'],
+            password=params['password'],
+            options=f"-c statement_timeout={int(statement_timeout)}"
+        )
+        self.slots = threading.BoundedSemaphore(maxconn)
+
+    @classmethod
+    def shared(cls, conn_id=DB_CONN_ID):
+        with cls._shared_lock:
+            if conn_id not in cls._shared_pools:
+                cls._shared_pools[conn_id] = cls(conn_id)
+            return cls._shared_pools[conn_id]
+
+    @contextmanager
+    def connection(self):
+        """Lease a connection, commit on success and roll back on error."""
+        self.slots.acquire()
+        try:
+            conn = self.pool.getconn()
+            broken = False
+            try:
+                with conn:
+                    yield conn
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                broken = True
+                raise
+            finally:
+                self.pool.putconn(conn, close=broken or bool(conn.closed))
+        finally:
+            self.slots.release()
+
+    def run(self, sql, parameters=None):
+        with self.connection() as conn, conn.cursor() as cur:
+            cur.execute(sql, parameters)
+
+    def get_records(self, sql, parameters=None):
+        with self.connection() as conn, conn.cursor() as cur:
+            cur.execute(sql, parameters)
+            return cur.fetchall()
+
+    def get_first(self, sql, parameters=None):
+        with self.connection() as conn, conn.cursor() as cur:
+            cur.execute(sql, parameters)
+            return cur.fetchone()
+
+    def get_pandas_df(self, sql, parameters=None):
+        with self.connection() as conn, conn.cursor() as cur:
+            cur.execute(sql, parameters)
+            return pd.DataFrame(cur.fetchall(), columns=[col[0] for col in cur.description])
+
+    def close_all(self):
+        self.pool.closeall()
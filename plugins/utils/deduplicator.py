@@ -0,0 +1,107 @@
+from utils.config import DEDUP_SCORE_THRESHOLD, DEDUP_AREA_TOLERANCE, DEDUP_PRICE_TOLERANCE
+
+
+def is_close(a, b, tolerance):
+    if a is None or b is None:
+        return False
+    a, b = float(a), float(b)
+    return abs(a - b) <= tolerance * max(abs(a), abs(b), 1)
+
+
+class NearDuplicateDetector:
+    """Finds the same property listed under several zimmo_codes, looking only at rows changed since the last run.
+
+    Fresh rows are only compared with rows in the same block: same postcode,
+    sub type, street and number, since similar attributes alone (common for
+    new-build units) never make a duplicate. Pairs that score at least
+    DEDUP_SCORE_THRESHOLD are recorded in zimmo_duplicates against the oldest
+    listing of their group, nothing is deleted.
+    """
+
+    def __init__(self, output, table_name='zimmo_data', threshold=DEDUP_SCORE_THRESHOLD,
+                 area_tolerance=DEDUP_AREA_TOLERANCE, price_tolerance=DEDUP_PRICE_TOLERANCE):
+        self.output = output
+        self.table_name = table_name
+        self.threshold = threshold
+        self.area_tolerance = area_tolerance
+        self.price_tolerance = price_tolerance
+
+    def same_address(self, a, b):
+        return bool(a["street"] and b["street"] and a["number"]
+                    and a["street"].strip().lower() == b["street"].strip().lower()
+                    and str(a["number"]).strip().lower() == str(b["number"] or "").strip().lower())
+
+    def score(self, a, b):
+        score = 0.0
+        if self.same_address(a, b):
+            score += 0.35
+        if is_close(a["living_area_m2"], b["living_area_m2"], self.area_tolerance):
+            score += 0.2
+        if is_close(a["price"], b["price"], self.price_tolerance):
+            score += 0.2
+        if is_close(a["ground_area_m2"], b["ground_area_m2"], self.area_tolerance):
+            score += 0.1
+        if a["bedroom"] is not None and a["bedroom"] == b["bedroom"]:
+            score += 0.1
+        if a["sub_type"] and a["sub_type"] == b["sub_type"]:
+            score += 0.05
+        return round(score, 3)
+
+    def find_matches(self, pairs):
+        matches = {}
+        ids = {}
+        for a, b in pairs:
+            key = tuple(sorted((a["zimmo_code"], b["zimmo_code"])))
+            if key in matches:
+                continue
+            ids[a["zimmo_code"]] = a["id"]
+            ids[b["zimmo_code"]] = b["id"]
+            score = self.score(a, b)
+            if score >= self.threshold and self.same_address(a, b):
+                matches[key] = score
+        return matches, ids
+
+    def group(self, matches, ids):
+        parent = {}
+
+        def find(code):
+            parent.setdefault(code, code)
+            while parent[code] != code:
+                parent[code] = parent[parent[code]]
+                code = parent[code]
+            return code
+
+        def union(a, b):
+            root_a, root_b = find(a), find(b)
+            if root_a == root_b:
+                return
+            if (ids.get(root_b, float("inf")), root_b) < (ids.get(root_a, float("inf")), root_a):
+                root_a, root_b = root_b, root_a
+            parent[root_b] = root_a
+
+        codes = {code for pair in matches for code in pair}
+        for code, canonical_code, canonical_id in self.output.get_canonical_codes(codes):
+            if canonical_id is not None:
+                ids[canonical_code] = canonical_id
+            union(canonical_code, code)
+        for a, b in matches:
+            union(a, b)
+
+        scores = {}
+        for (a, b), score in matches.items():
+            scores[a] = max(scores.get(a, 0), score)
+            scores[b] = max(scores.get(b, 0), score)
+        return [(code, find(code), scores.get(code)) for code in parent if find(code) != code]
+
+    def run(self):
+        since = self.output.get_dedup_watermark(self.table_name)
+        latest = self.output.get_latest_update(self.table_name)
+        pairs = self.output.get_duplicate_candidates(since, self.table_name)
+        matches, ids = self.find_matches(pairs)
+        rows = self.group(matches, ids)
+        self.output.save_duplicates(rows)
+        if latest is not None:
+            self.output.save_dedup_watermark(latest, self.table_name)
+        print(f"🧬 Compared {len(pairs)} blocked candidate pairs changed since {since or 'the beginning'}: "
+              f"{len(matches)} near-duplicate pairs, {len(rows)} listings marked as duplicates")
+        return len(rows)
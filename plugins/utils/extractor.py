@@ -0,0 +1,158 @@
+import re
+from bs4 import BeautifulSoup
+from bs4.dammit import UnicodeDammit
+from utils.retriever import Retriever
+from utils.config import EXTRACTOR_BACKEND
+
+try:
+    import lxml.etree
+    import lxml.html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+
+RESULT_COUNT_PATTERN = re.compile(
+    r"(\d{1,3}(?:[.\s\u00a0]\d{3})+|\d+)\s*(?:zoekresultaten|resultaten|panden|woningen|huizen|appartementen|results)",
+    re.IGNORECASE
+)
+
+
+def parse_result_count(text):
+    match = RESULT_COUNT_PATTERN.search(text or "")
+    if not match:
+        return None
+    return int(re.sub(r"\D", "", match.group(1)))
+
+
+RESULT_COUNT_CLASS = re.compile(r"result.*count|count.*result")
+
+
+def has_result_count_class(element):
+    """True when a single class token names a result count, for bs4 tags (class list) and lxml elements (string)."""
+    tokens = element.get("class") or []
+    if isinstance(tokens, str):
+        tokens = tokens.split()
+    return any(RESULT_COUNT_CLASS.search(token) for token in tokens)
+
+
+def has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+class LxmlRetriever(Retriever):
+    """Retriever over an lxml tree, returning exactly what Retriever returns for the same page."""
+
+    def _first(self, xpath, node=None):
+        found = (node if node is not None else self.soup).xpath(xpath)
+        return found[0] if found else None
+
+    def get_zimmo_code(self):
+        zimmo_code_elem = self._first(f"//p[{has_class('zimmo-code')}]")
+        if zimmo_code_elem is not None:
+            code = zimmo_code_elem.text_content().strip()
+            if code.lower().startswith("zimmo-code:"):
+                code = code.split(":", 1)[1].strip()
+            if code:
+                return code
+        return self.get_zimmo_code_from_url(self.url)
+
+    def get_feature_info(self):
+        main_features_section = None
+        for xpath in ("//section[@id='main-features']",
+                      f"//div[{has_class('features-section')}]",
+                      f"//ul[{has_class('main-features')}]"):
+            main_features_section = self._first(xpath)
+            if main_features_section is not None:
+                break
+        if main_features_section is None:
+            print("⚠️ Could not find 'main-features'")
+            return None
+
+        feature = {}
+        for li in main_features_section.iterdescendants("li"):
+            label = self._first(f".//strong[{has_class('feature-label')}]", li)
+            value = self._first(f".//span[{has_class('feature-value')}]", li)
+            if label is not None:
+                key = label.text_content().strip().lower()
+                val = value.text_content().strip() if value is not None else None
+                feature[key] = val
+        return feature
+
+    def get_mobiscore(self):
+        mobiscore_elem = self._first(f"//span[{has_class('section-mobiscore_total-score')}]")
+        if mobiscore_elem is not None:
+            return mobiscore_elem.text_content()
+        return None
+
+
+class SoupExtractor:
+    name = "soup"
+
+    def parse(self, raw_html):
+        return BeautifulSoup(raw_html, "html.parser")
+
+    def retriever(self, doc, url=None):
+        return Retriever(doc, url)
+
+    def get_hrefs(self, doc):
+        hrefs = []
+        for listing in doc.find_all("div", class_="property-item"):
+            a_elem = listing.find("a", href=True)
+            if a_elem and a_elem.get('href'):
+                hrefs.append(a_elem['href'])
+        return hrefs
+
+
+    def get_result_count(self, doc):
+        candidates = doc.find_all(has_result_count_class)
+        candidates += doc.find_all("h1")
+        for elem in candidates:
+            count = parse_result_count(elem.get_text(" "))
+            if count is not None:
+                return count
+        return None
+
+
+class LxmlExtractor:
+    name = "lxml"
+
+    def parse(self, raw_html):
+        if isinstance(raw_html, bytes):
+            raw_html = UnicodeDammit(raw_html, is_html=True).unicode_markup
+        raw_html = re.sub(r"^\s*<\?xml[^>]*\?>", "", raw_html)
+        try:
+            return lxml.html.document_fromstring(raw_html)
+        except lxml.etree.ParserError:
+            # empty or whitespace-only body, html.parser gives an empty document here too
+            return lxml.html.document_fromstring("<html></html>")
+
+    def retriever(self, doc, url=None):
+        return LxmlRetriever(doc, url)
+
+    def get_hrefs(self, doc):
+        hrefs = []
+        for listing in doc.xpath(f"//div[{has_class('property-item')}]"):
+            a_elems = listing.xpath(".//a[@href]")
+            if a_elems and a_elems[0].get('href'):
+                hrefs.append(a_elems[0].get('href'))
+        return hrefs
+
+
+    def get_result_count(self, doc):
+        candidates = [elem for elem in doc.xpath("//*[contains(@class, 'result') and contains(@class, 'count')]")
+                      if has_result_count_class(elem)]
+        candidates += doc.xpath("//h1")
+        for elem in candidates:
+            count = parse_result_count(" ".join(elem.itertext()))
+            if count is not None:
+                return count
+        return None
+
+
+def get_extractor(backend=EXTRACTOR_BACKEND):
+    if backend == "lxml":
+        if LXML_AVAILABLE:
+            return LxmlExtractor()
+        print("⚠️ lxml not installed, falling back to html.parser extraction")
+    return SoupExtractor()
@@ -0,0 +1,161 @@
+import json
+import os
+import re
+import unicodedata
+from datetime import datetime
+import pandas as pd
+from utils.config import GEO_PLACES_PATH, GEO_STATS_PATH
+
+PROVINCE_RANGES = [
+    (1000, 1299, "Brussels"),
+    (1300, 1499, "Walloon Brabant"),
+    (1500, 1999, "Flemish Brabant"),
+    (2000, 2999, "Antwerp"),
+    (3000, 3499, "Flemish Brabant"),
+    (3500, 3999, "Limburg"),
+    (4000, 4999, "Liège"),
+    (5000, 5999, "Namur"),
+    (6000, 6599, "Hainaut"),
+    (6600, 6999, "Luxembourg"),
+    (7000, 7999, "Hainaut"),
+    (8000, 8999, "West Flanders"),
+    (9000, 9999, "East Flanders"),
+]
+
+
+def normalize_name(name):
+    name = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode().lower()
+    name = re.sub(r"\(.*?\)", " ", name)
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", name).split())
+
+
+def province_for(postcode):
+    try:
+        code = int(str(postcode).strip()[:4])
+    except ValueError:
+        return None
+    for low, high, province in PROVINCE_RANGES:
+        if low <= code <= high:
+            return province
+    return None
+
+
+class GeoAggregator:
+    """Per-postcode and per-region price statistics with coordinates, ready to draw on a map.
+
+    Postcodes are placed with the bundled GeoNames table in data/geo: directly
+    when it lists the postcode, otherwise at the place matching the most common
+    city of the postcode's listings, by its own or a Dutch/French alternate
+    name. Postcodes that match nothing keep their statistics but get no
+    coordinates.
+    """
+
+    def __init__(self, places_path=GEO_PLACES_PATH):
+        self.places_path = places_path
+        self.by_postcode = {}
+        self.by_name = {}
+
+    def load_places(self):
+        places = pd.read_csv(self.places_path, dtype={"postcode": str}, keep_default_na=False)
+        alternates = []
+        for row in places.itertuples(index=False):
+            place = {"name": row.name, "lat": float(row.lat), "lon": float(row.lon),
+                     "arrondissement": row.arrondissement or None}
+            if row.postcode:
+                self.by_postcode.setdefault(row.postcode, place)
+            self.by_name.setdefault(normalize_name(row.name), place)
+            alternates += [(name, place) for name in getattr(row, "alternate_names", "").split("|") if name]
+        for name, place in alternates:
+            self.by_name.setdefault(normalize_name(name), place)
+        print(f"🗺️ Loaded {len(places)} places ({len(self.by_postcode)} postcodes) from {self.places_path}")
+        return self
+
+    def locate(self, postcode, cities):
+        if postcode in self.by_postcode:
+            return self.by_postcode[postcode]
+        for city in cities:
+            place = self.by_name.get(normalize_name(city))
+            if place is not None:
+                return place
+        return None
+
+    def prepare(self, listings):
+        df = pd.DataFrame({
+            "postcode": listings["postcode"].astype("string").str.strip(),
+            "city": listings["city"].astype("string"),
+            "price": pd.to_numeric(listings["price"], errors="coerce").astype(float),
+            "living_area_m2": pd.to_numeric(listings["living_area_m2"], errors="coerce").astype(float),
+        })
+        df = df[df["postcode"].notna() & (df["postcode"] != "")]
+        df["price_per_m2"] = df["price"] / df["living_area_m2"].where(df["living_area_m2"] > 0)
+        return df
+
+    def summarize(self, df, by):
+        grouped = df.groupby(by, observed=True)
+        return pd.DataFrame({
+            "count": grouped.size(),
+            "median_price": grouped["price"].median(),
+            "median_price_per_m2": grouped["price_per_m2"].median(),
+        }).reset_index()
+
+    def weighted_centroids(self, postcodes, by):
+        located = postcodes.dropna(subset=["lat", "lon"])
+        if located.empty:
+            return pd.DataFrame(columns=[by, "lat", "lon"])
+        weighted = located.assign(lat=located["lat"] * located["count"], lon=located["lon"] * located["count"])
+        sums = weighted.groupby(by)[["lat", "lon", "count"]].sum()
+        return pd.DataFrame({"lat": sums["lat"] / sums["count"], "lon": sums["lon"] / sums["count"]}).reset_index()
+
+    def aggregate(self, listings):
+        if not self.by_name and not self.by_postcode:
+            self.load_places()
+        df = self.prepare(listings)
+        cities = df.groupby("postcode")["city"].agg(lambda s: s.dropna().value_counts().index.tolist())
+
+        places = []
+        for postcode, names in cities.items():
+            place = self.locate(postcode, names) or {}
+            places.append({
+                "postcode": postcode,
+                "city": names[0] if names else None,
+                "place": place.get("name"),
+                "lat": place.get("lat"),
+                "lon": place.get("lon"),
+                "province": province_for(postcode),
+                "arrondissement": place.get("arrondissement"),
+            })
+        postcodes = self.summarize(df, "postcode").merge(pd.DataFrame(places), on="postcode", how="left")
+
+        df = df.merge(postcodes[["postcode", "province", "arrondissement"]], on="postcode", how="left")
+        regions = {}
+        for level in ("province", "arrondissement"):
+            if postcodes[level].notna().any():
+                stats = self.summarize(df.dropna(subset=[level]), level)
+                regions[level] = stats.merge(self.weighted_centroids(postcodes, level), on=level, how="left")
+            else:
+                regions[level] = pd.DataFrame()
+
+        located = int(postcodes["lat"].notna().sum())
+        print(f"🗺️ Aggregated {len(df)} listings into {len(postcodes)} postcodes "
+              f"({located} placed on the map) and {len(regions['province'])} provinces")
+        return postcodes, regions
+
+    def run(self, listings, path=GEO_STATS_PATH):
+        postcodes, regions = self.aggregate(listings)
+
+        def records(frame):
+            return json.loads(frame.to_json(orient="records")) if not frame.empty else []
+
+        geo_stats = {
+            "generated_at": datetime.now().isoformat(),
+            "postcodes": records(postcodes),
+            "provinces": records(regions["province"]),
+            "arrondissements": records(regions["arrondissement"]),
+        }
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(geo_stats, f)
+        os.replace(tmp_path, path)
+        print(f"✅ Geo statistics saved to {path}")
+        return len(postcodes)
@@ -0,0 +1,98 @@
+import bisect
+import hashlib
+import math
+from utils.config import KNOWN_INDEX_BLOOM_THRESHOLD, KNOWN_INDEX_BLOOM_ERROR_RATE, KNOWN_REFRESH_DAYS
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=KNOWN_INDEX_BLOOM_ERROR_RATE):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray(self.size // 8 + 1)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class KnownListingIndex:
+    """In-memory set of zimmo_codes seen in the last refresh_days days, loaded once per run.
+
+    Listings last seen longer ago are left out, so when they show up on a
+    crawled results page they are downloaded again and price or attribute
+    changes reach save_to_db and the history table. An unchanged page still
+    records the sighting through Output.mark_seen.
+
+    Up to KNOWN_INDEX_BLOOM_THRESHOLD codes are kept as a sorted array. Larger
+    tables use a Bloom filter, and its positives are confirmed against the DB.
+    """
+
+    def __init__(self, output, table_name='zimmo_data', bloom_threshold=KNOWN_INDEX_BLOOM_THRESHOLD,
+                 refresh_days=KNOWN_REFRESH_DAYS):
+        self.output = output
+        self.table_name = table_name
+        self.refresh_days = refresh_days
+        self.bloom_threshold = bloom_threshold
+        self.codes = []
+        self.bloom = None
+        self.added = set()
+        self.loaded_count = 0
+
+    def load(self):
+        codes = self.output.get_zimmo_codes(self.table_name, self.refresh_days)
+        if len(codes) > self.bloom_threshold:
+            self.bloom = BloomFilter(len(codes))
+            for code in codes:
+                self.bloom.add(code)
+            self.codes = []
+            print(f"📇 Loaded {len(codes)} recently seen listings into a Bloom filter")
+        else:
+            self.codes = sorted(codes)
+            self.bloom = None
+            print(f"📇 Loaded {len(codes)} recently seen listings")
+        self.added = set()
+        self.loaded_count = len(codes)
+        return self
+
+    def add(self, codes):
+        self.added.update(str(code) for code in codes)
+
+    def _in_loaded(self, code):
+        if self.bloom is not None:
+            return code in self.bloom
+        i = bisect.bisect_left(self.codes, code)
+        return i < len(self.codes) and self.codes[i] == code
+
+    def __contains__(self, code):
+        code = str(code)
+        if code in self.added:
+            return True
+        if not self._in_loaded(code):
+            return False
+        if self.bloom is not None:
+            return self.output.exists(code, self.table_name, self.refresh_days)
+        return True
+
+    def filter_known(self, codes):
+        codes = [str(code) for code in codes]
+        known = {code for code in codes if code in self.added}
+        candidates = [code for code in codes if code not in known and self._in_loaded(code)]
+        if self.bloom is not None and candidates:
+            known.update(self.output.get_existing_codes(candidates, self.table_name, self.refresh_days))
+        else:
+            known.update(candidates)
+        return known
+
+    def __len__(self):
+        return self.loaded_count + len(self.added)
@@ -1,23 +1,27 @@
+import csv
+import io
+import math
+import time
+import uuid
 import pandas as pd
-from airflow.providers.postgres.hooks.postgres import PostgresHook
-from utils.config import ALL_KEYS
+from utils.config import ALL_KEYS, READ_CHUNK_SIZE, DASHBOARD_QUANTILES, STATS_VIEWS, SEEN_TOUCH_INTERVAL_HOURS
+from utils.cleaner import Cleaner
+from utils.db import ConnectionPool
+from utils.quantile_sketch import QuantileSketch
 from psycopg2.extras import execute_values
 
 class Output:
-    _shared_hook = None
-
     def __init__(self, postgres_conn_id='postgres_default'):
         self.table_name = "zimmo_data"
         self.columns = ["zimmo_code", "type", "sub_type", "price", "street", "number",
                         "postcode", "city", "living_area_m2", "ground_area_m2",
                         "bedroom", "bathroom", "garage", "garden", "epc_kwh_m2",
                         "renovation_obligation", "year_built", "mobiscore",
-                        "url", "scraped_at"]
-        if Output._shared_hook is None:
-            Output._shared_hook = PostgresHook(postgres_conn_id=postgres_conn_id)
-        self.postgres_hook = Output._shared_hook
+                        "url", "scraped_at", "fingerprint"]
+        self.db = ConnectionPool.shared(postgres_conn_id)
 
-    def save_to_db(self, data: dict, table_name='zimmo_data'):
+    def save_to_db(self, data: dict, table_name='zimmo_data', history_table='zimmo_history',
+                   aggregates_table='dashboard_aggregates'):
         if not data:
             print("No data to save")
             return
@@ -26,6 +30,8 @@ class Output:
         for zimmo_code, row in data.items():
             if 'zimmo_code' not in row:
                 row['zimmo_code'] = zimmo_code
+            if not row.get('fingerprint'):
+                row['fingerprint'] = Cleaner.fingerprint(row)
             row = {col: row.get(col) for col in self.columns}
             rows.append(row)
             
@@ -33,85 +39,539 @@ class Output:
             print("No rows to insert")
             return
 
-        insert_query = f"""
-        INSERT INTO {table_name} ({', '.join(self.columns)})
-        VALUES %s
-        ON CONFLICT (zimmo_code) DO UPDATE SET
-            {', '.join([f"{col}=EXCLUDED.{col}" for col in self.columns if col != "zimmo_code"])}
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(["\\N" if row[col] is None else row[col] for col in self.columns])
+        buffer.seek(0)
+
+        staging_table = f"{table_name}_staging"
+        columns = ', '.join(self.columns)
+        merge_query = f"""
+        WITH merged AS (
+            INSERT INTO {table_name} ({columns})
+            SELECT DISTINCT ON (zimmo_code) {columns} FROM {staging_table}
+            ORDER BY zimmo_code
+            ON CONFLICT (zimmo_code) DO UPDATE SET
+                {', '.join([f"{col}=EXCLUDED.{col}" for col in self.columns if col != "zimmo_code"])},
+                updated_at=CURRENT_TIMESTAMP
+            WHERE {table_name}.fingerprint IS DISTINCT FROM EXCLUDED.fingerprint
+            RETURNING (xmax = 0) AS inserted
+        )
+        SELECT
+            COUNT(*) FILTER (WHERE inserted),
+            COUNT(*) FILTER (WHERE NOT inserted),
+            (SELECT COUNT(DISTINCT zimmo_code) FROM {staging_table})
+        FROM merged;
+        """
+        history_query = f"""
+        INSERT INTO {history_table} (zimmo_code, fingerprint, price, attributes, valid_from)
+        SELECT s.zimmo_code, s.fingerprint, s.price,
+               to_jsonb(s) - 'zimmo_code' - 'fingerprint' - 'price' - 'scraped_at',
+               COALESCE(s.scraped_at, CURRENT_TIMESTAMP)
+        FROM (
+            SELECT DISTINCT ON (zimmo_code) * FROM {staging_table} ORDER BY zimmo_code
+        ) s
+        LEFT JOIN {table_name} t ON t.zimmo_code = s.zimmo_code
+        WHERE t.fingerprint IS DISTINCT FROM s.fingerprint;
+        """
+        staged = f"(SELECT DISTINCT ON (zimmo_code) * FROM {staging_table} ORDER BY zimmo_code)"
+        changes = f"""
+        SELECT -1 AS sign, t.type, t.city, t.price, t.living_area_m2
+        FROM {staged} s
+        JOIN {table_name} t ON t.zimmo_code = s.zimmo_code
+        WHERE t.fingerprint IS DISTINCT FROM s.fingerprint AND t.price IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM zimmo_duplicates x WHERE x.zimmo_code = s.zimmo_code)
+        UNION ALL
+        SELECT 1, s.type, s.city, s.price, s.living_area_m2
+        FROM {staged} s
+        LEFT JOIN {table_name} t ON t.zimmo_code = s.zimmo_code
+        WHERE t.fingerprint IS DISTINCT FROM s.fingerprint AND s.price IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM zimmo_duplicates x WHERE x.zimmo_code = s.zimmo_code)
+        """
+        # Unchanged rows still record the sighting for the refresh window, but at most once every
+        # SEEN_TOUCH_INTERVAL_HOURS: a row re-seen on every run costs one dead tuple a day instead
+        # of one per run, and scraped_at may lag the last sighting by up to that interval.
+        seen_query = f"""
+        UPDATE {table_name} t SET scraped_at = COALESCE(s.scraped_at, LOCALTIMESTAMP)
+        FROM {staged} s
+        WHERE t.zimmo_code = s.zimmo_code AND t.fingerprint = s.fingerprint
+          AND (t.scraped_at IS NULL OR t.scraped_at < COALESCE(s.scraped_at, LOCALTIMESTAMP)
+                                                      - make_interval(hours => {int(SEEN_TOUCH_INTERVAL_HOURS)}));
         """
-        print(insert_query)
 
         try:
-            values = [tuple(row[col] for col in self.columns) for row in rows]
-     
-            conn = self.postgres_hook.get_conn()
-            with conn, conn.cursor() as cur:
-                template = '(' + ','.join(['%s'] * len(self.columns)) + ')'
-                
-                chunk_size = 500
-                for i in range(0, len(values), chunk_size):
-                    chunk = values[i:i+chunk_size]
-                    execute_values(cur, insert_query, chunk, template=template)
-            print(f"Saved {len(values)} rows to table '{table_name}' (bulk)")
+            with self.db.connection() as conn, conn.cursor() as cur:
+                cur.execute(f"""
+                CREATE TEMP TABLE {staging_table} ON COMMIT DROP AS
+                SELECT {columns} FROM {table_name} WITH NO DATA;
+                """)
+                cur.copy_expert(
+                    f"COPY {staging_table} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                    buffer
+                )
+                versions = 0
+                if history_table:
+                    cur.execute(history_query)
+                    versions = cur.rowcount
+                if aggregates_table:
+                    self.seed_dashboard_aggregates(cur, table_name, aggregates_table)
+                    cur.execute(self.aggregates_query(changes, aggregates_table))
+                cur.execute(merge_query)
+                inserted, updated, staged = cur.fetchone()
+                cur.execute(seen_query)
+            counts = {"inserted": inserted, "updated": updated, "unchanged": staged - inserted - updated,
+                      "versions": versions}
+            print(f"Saved {staged} rows to table '{table_name}' (copy): "
+                  f"{counts['inserted']} inserted, {counts['updated']} updated, {counts['unchanged']} unchanged")
+            if history_table:
+                print(f"📜 Appended {versions} versions to '{history_table}'")
+            return counts
         except Exception as e:
             print(f"Error saving to database: {e}")
             raise
         
-    def exists(self, zimmo_code: str, table_name='zimmo_data') -> bool:
-        query = f"SELECT 1 FROM {table_name} WHERE zimmo_code = %s LIMIT 1;"
+    def refreshed_condition(self, refresh_days):
+        """SQL condition (and its parameters) keeping listings seen within the last refresh_days days."""
+        if refresh_days is None:
+            return "", ()
+        return (" AND GREATEST(updated_at, scraped_at) >= LOCALTIMESTAMP - make_interval(days => %s)",
+                (int(refresh_days),))
+
+    def exists(self, zimmo_code: str, table_name='zimmo_data', refresh_days=None) -> bool:
+        condition, params = self.refreshed_condition(refresh_days)
+        query = f"SELECT 1 FROM {table_name} WHERE zimmo_code = %s{condition} LIMIT 1;"
         try:
-            param = (str(zimmo_code),)
-            result = self.postgres_hook.get_first(sql=query, parameters=param)
+            param = (str(zimmo_code),) + params
+            result = self.db.get_first(query, parameters=param)
             return result is not None
         except Exception as e:
             print(f"❌ Error checking existing zimmo_code {zimmo_code}: {e}")
             return False
         
-    def deduplicate(self, table_name=None, unique_col="zimmo_code"):
+    def get_zimmo_codes(self, table_name='zimmo_data', refresh_days=None):
+        condition, params = self.refreshed_condition(refresh_days)
+        query = f"SELECT zimmo_code FROM {table_name} WHERE TRUE{condition};"
+        try:
+            return [row[0] for row in self.db.get_records(query, parameters=params or None)]
+        except Exception as e:
+            print(f"❌ Error loading known zimmo_codes: {e}")
+            return []
+
+    def get_existing_codes(self, zimmo_codes, table_name='zimmo_data', refresh_days=None):
+        condition, params = self.refreshed_condition(refresh_days)
+        query = f"SELECT zimmo_code FROM {table_name} WHERE zimmo_code = ANY(%s){condition};"
+        try:
+            param = ([str(code) for code in zimmo_codes],) + params
+            return {row[0] for row in self.db.get_records(query, parameters=param)}
+        except Exception as e:
+            print(f"❌ Error checking existing zimmo_codes: {e}")
+            return set()
+
+    def mark_seen(self, zimmo_codes, table_name='zimmo_data'):
+        """Record a sighting of listings whose page had not changed, at most once every SEEN_TOUCH_INTERVAL_HOURS."""
+        if not zimmo_codes:
+            return 0
+        query = f"""
+        UPDATE {table_name} SET scraped_at = LOCALTIMESTAMP
+        WHERE zimmo_code = ANY(%s)
+          AND (scraped_at IS NULL OR scraped_at < LOCALTIMESTAMP - make_interval(hours => %s));
+        """
+        with self.db.connection() as conn, conn.cursor() as cur:
+            cur.execute(query, ([str(code) for code in zimmo_codes], int(SEEN_TOUCH_INTERVAL_HOURS)))
+            return cur.rowcount
+        
+    def get_latest_update(self, table_name=None):
         if table_name is None:
             table_name = self.table_name
-        
+        result = self.db.get_first(f"SELECT MAX(updated_at) FROM {table_name};")
+        return result[0] if result else None
+
+    def get_dedup_watermark(self, table_name=None):
+        if table_name is None:
+            table_name = self.table_name
+        result = self.db.get_first(
+            "SELECT last_updated_at FROM dedup_state WHERE table_name = %s;", parameters=(table_name,)
+        )
+        return result[0] if result else None
+
+    def save_dedup_watermark(self, last_updated_at, table_name=None):
+        if table_name is None:
+            table_name = self.table_name
+        query = """
+        INSERT INTO dedup_state (table_name, last_updated_at, updated_at)
+        VALUES (%s, %s, CURRENT_TIMESTAMP)
+        ON CONFLICT (table_name) DO UPDATE SET
+            last_updated_at = EXCLUDED.last_updated_at,
+            updated_at = EXCLUDED.updated_at
+        """
+        self.db.run(query, parameters=(table_name, last_updated_at))
+
+    def get_duplicate_candidates(self, since, table_name=None):
+        if table_name is None:
+            table_name = self.table_name
+        fields = ["zimmo_code", "id", "sub_type", "price", "street", "number",
+                  "living_area_m2", "ground_area_m2", "bedroom"]
+        query = f"""
+        WITH fresh AS (
+            SELECT * FROM {table_name}
+            WHERE updated_at >= COALESCE(%s::timestamp, '-infinity'::timestamp)
+              AND postcode IS NOT NULL AND street IS NOT NULL AND number IS NOT NULL
+        )
+        SELECT {', '.join(f"f.{col}" for col in fields)}, {', '.join(f"d.{col}" for col in fields)}
+        FROM fresh f
+        JOIN {table_name} d
+          ON d.postcode = f.postcode
+         AND d.sub_type IS NOT DISTINCT FROM f.sub_type
+         AND lower(trim(d.street)) = lower(trim(f.street))
+         AND lower(trim(d.number)) = lower(trim(f.number))
+         AND d.zimmo_code <> f.zimmo_code;
+        """
+        records = self.db.get_records(query, parameters=(since,))
+        return [
+            (dict(zip(fields, row[:len(fields)])), dict(zip(fields, row[len(fields):])))
+            for row in records
+        ]
+
+    def get_canonical_codes(self, zimmo_codes):
+        query = """
+        SELECT x.zimmo_code, x.canonical_code, d.id
+        FROM zimmo_duplicates x
+        LEFT JOIN zimmo_data d ON d.zimmo_code = x.canonical_code
+        WHERE x.zimmo_code = ANY(%s) OR x.canonical_code = ANY(%s);
+        """
+        codes = [str(code) for code in zimmo_codes]
+        records = self.db.get_records(query, parameters=(codes, codes))
+        return [(code, canonical_code, canonical_id) for code, canonical_code, canonical_id in records]
+
+    def save_duplicates(self, rows):
+        if not rows:
+            return
+        query = """
+        INSERT INTO zimmo_duplicates (zimmo_code, canonical_code, score, detected_at)
+        VALUES %s
+        ON CONFLICT (zimmo_code) DO UPDATE SET
+            canonical_code = EXCLUDED.canonical_code,
+            score = COALESCE(EXCLUDED.score, zimmo_duplicates.score),
+            detected_at = EXCLUDED.detected_at
+        """
+        changes = """
+        SELECT -1 AS sign, d.type, d.city, d.price, d.living_area_m2
+        FROM zimmo_data d
+        WHERE d.zimmo_code = ANY(%s) AND d.price IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM zimmo_duplicates x WHERE x.zimmo_code = d.zimmo_code)
+        """
+        with self.db.connection() as conn, conn.cursor() as cur:
+            self.seed_dashboard_aggregates(cur)
+            cur.execute(self.aggregates_query(changes), ([str(row[0]) for row in rows],))
+            execute_values(cur, query, rows, template="(%s, %s, %s, CURRENT_TIMESTAMP)", page_size=500)
+
+    def get_history(self, as_of=None, zimmo_code=None, history_table='zimmo_history'):
+        conditions = []
+        params = []
+        if as_of is not None:
+            conditions.append("valid_from <= %s")
+            params.append(as_of)
+        if zimmo_code is not None:
+            conditions.append("zimmo_code = %s")
+            params.append(str(zimmo_code))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
         query = f"""
-        DELETE FROM {table_name} a
-        USING {table_name} b
-        WHERE a.ctid < b.ctid
-          AND a.{unique_col} = b.{unique_col};
+        SELECT DISTINCT ON (zimmo_code) zimmo_code, fingerprint, price, attributes, valid_from
+        FROM {history_table}
+        {where}
+        ORDER BY zimmo_code, valid_from DESC, id DESC
         """
         try:
-            self.postgres_hook.run(query)
-            print(f"✅ Deduplicated table '{table_name}' on column '{unique_col}'")
+            return self.db.get_pandas_df(query, parameters=params or None)
         except Exception as e:
-            print(f"❌ Deduplication failed: {e}")
+            print(f"❌ Reading history failed: {e}")
             raise
 
-    def read_db(self, table_name=None, limit=None):
+    def build_select(self, table_name=None, columns=None, where=None, limit=None, order_by=None):
         if table_name is None:
             table_name = self.table_name
-        query = f"SELECT * FROM {table_name}"
+        query = f"SELECT {', '.join(columns) if columns else '*'} FROM {table_name}"
+        if where:
+            query += f" WHERE {where}"
+        if order_by:
+            query += f" ORDER BY {order_by}"
         if limit:
-            query += f" LIMIT {limit}"
+            query += f" LIMIT {int(limit)}"
+        return query
+
+    def read_db(self, table_name=None, limit=None, columns=None, where=None, params=None, order_by=None):
+        query = self.build_select(table_name, columns, where, limit, order_by)
         try:
- 
-            try:
-                df = self.postgres_hook.get_pandas_df(query)
-                return df
-            except Exception:
-
-                records = self.postgres_hook.get_records(query)
-                column_query = f"""
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_name = '{table_name}' 
-                ORDER BY ordinal_position;
-                """
-                column_records = self.postgres_hook.get_records(column_query)
-                columns = [row[0] for row in column_records]
-                df = pd.DataFrame(records, columns=columns)
-                return df
+            return self.db.get_pandas_df(query, parameters=params)
         except Exception as e:
             print(f"❌ Reading DB failed: {e}")
             raise
+
+    def iter_db(self, table_name=None, columns=None, where=None, params=None, order_by=None,
+                chunk_size=READ_CHUNK_SIZE):
+        """Yield the query result as DataFrames of at most chunk_size rows, read through a server-side cursor."""
+        query = self.build_select(table_name, columns, where, None, order_by)
+        with self.db.connection() as conn, conn.cursor(name=f"read_{uuid.uuid4().hex}") as cur:
+            cur.itersize = chunk_size
+            cur.execute(query, params)
+            names = None
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if names is None:
+                    names = [col[0] for col in cur.description]
+                if not rows:
+                    break
+                yield pd.DataFrame(rows, columns=names)
+
+    def aggregate(self, expressions: dict, table_name=None, where=None, params=None, group_by=None):
+        group_by = list(group_by or [])
+        selected = group_by + [f"{expression} AS {name}" for name, expression in expressions.items()]
+        query = self.build_select(table_name, selected, where)
+        if group_by:
+            query += f" GROUP BY {', '.join(group_by)}"
+        try:
+            records = self.db.get_records(query, parameters=params)
+            return pd.DataFrame(records, columns=group_by + list(expressions))
+        except Exception as e:
+            print(f"❌ Aggregating DB failed: {e}")
+            raise
+
+    def aggregates_query(self, changes, aggregates_table='dashboard_aggregates'):
+        """Statement folding signed listing rows (sign, type, city, price, living_area_m2) into the running aggregates.
+
+        Counts and sums are kept per type and city; quantile sketches only for 'all'.
+        """
+        sketch = QuantileSketch()
+        return f"""
+        WITH changes AS ({changes}),
+        deltas AS (
+            SELECT 'all' AS dimension, '' AS group_key, sign, price, living_area_m2 FROM changes
+            UNION ALL
+            SELECT 'type', type, sign, price, living_area_m2 FROM changes WHERE type IS NOT NULL
+            UNION ALL
+            SELECT 'city', city, sign, price, living_area_m2 FROM changes WHERE city IS NOT NULL
+        ),
+        totals AS (
+            INSERT INTO {aggregates_table} (dimension, group_key, n, price_sum, price_sum_sq)
+            SELECT dimension, group_key, SUM(sign), SUM(sign * price), SUM(sign * price * price)
+            FROM deltas
+            GROUP BY dimension, group_key
+            ORDER BY dimension, group_key
+            ON CONFLICT (dimension, group_key) DO UPDATE SET
+                n = {aggregates_table}.n + EXCLUDED.n,
+                price_sum = {aggregates_table}.price_sum + EXCLUDED.price_sum,
+                price_sum_sq = {aggregates_table}.price_sum_sq + EXCLUDED.price_sum_sq,
+                updated_at = CURRENT_TIMESTAMP
+        )
+        INSERT INTO {aggregates_table}_sketch (dimension, group_key, metric, bucket, n)
+        SELECT dimension, group_key, metric, bucket, SUM(sign)
+        FROM (
+            SELECT dimension, group_key, 'price' AS metric, {sketch.bucket_sql('price')} AS bucket, sign
+            FROM deltas WHERE dimension = 'all' AND price > 0
+            UNION ALL
+            SELECT dimension, group_key, 'price_per_m2', {sketch.bucket_sql('price / living_area_m2')}, sign
+            FROM deltas WHERE dimension = 'all' AND price > 0 AND living_area_m2 > 0
+        ) buckets
+        GROUP BY dimension, group_key, metric, bucket
+        ORDER BY dimension, group_key, metric, bucket
+        ON CONFLICT (dimension, group_key, metric, bucket) DO UPDATE SET
+            n = {aggregates_table}_sketch.n + EXCLUDED.n;
+        """
+
+    def seed_dashboard_aggregates(self, cur, table_name='zimmo_data', aggregates_table='dashboard_aggregates',
+                                  force=False):
+        """Rebuild the aggregates from table_name in cur's transaction unless dashboard_aggregates_state
+        marks them as seeded. The check is repeated under the table lock, so concurrent writers
+        seed once and only then apply their deltas. Returns True when the aggregates were rebuilt.
+        """
+        marker_query = "SELECT 1 FROM dashboard_aggregates_state WHERE aggregates_table = %s"
+        if not force:
+            cur.execute(marker_query, (aggregates_table,))
+            if cur.fetchone():
+                return False
+        cur.execute(f"LOCK TABLE {aggregates_table}, {aggregates_table}_sketch, dashboard_aggregates_state "
+                    "IN EXCLUSIVE MODE")
+        if not force:
+            cur.execute(marker_query, (aggregates_table,))
+            if cur.fetchone():
+                return False
+        changes = f"""
+        SELECT 1 AS sign, d.type, d.city, d.price, d.living_area_m2
+        FROM {table_name} d
+        WHERE d.price IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM zimmo_duplicates x WHERE x.zimmo_code = d.zimmo_code)
+        """
+        cur.execute(f"DELETE FROM {aggregates_table}_sketch")
+        cur.execute(f"DELETE FROM {aggregates_table}")
+        cur.execute(self.aggregates_query(changes, aggregates_table))
+        cur.execute("""
+        INSERT INTO dashboard_aggregates_state (aggregates_table, seeded_at)
+        VALUES (%s, CURRENT_TIMESTAMP)
+        ON CONFLICT (aggregates_table) DO UPDATE SET seeded_at = EXCLUDED.seeded_at
+        """, (aggregates_table,))
+        print(f"🧮 Rebuilt dashboard aggregates from '{table_name}'")
+        return True
+
+    def rebuild_dashboard_aggregates(self, table_name='zimmo_data', aggregates_table='dashboard_aggregates'):
+        try:
+            with self.db.connection() as conn, conn.cursor() as cur:
+                self.seed_dashboard_aggregates(cur, table_name, aggregates_table, force=True)
+        except Exception as e:
+            print(f"❌ Rebuilding dashboard aggregates failed: {e}")
+            raise
+
+    def get_sketches(self, aggregates_table='dashboard_aggregates'):
+        query = f"""
+        SELECT metric, bucket, n FROM {aggregates_table}_sketch
+        WHERE dimension = 'all' AND group_key = '' AND n > 0
+        """
+        sketches = {}
+        for metric, bucket, n in self.db.get_records(query):
+            sketches.setdefault(metric, QuantileSketch()).add_bucket(bucket, n)
+        return sketches
+
+    def get_dashboard_stats(self, aggregates_table='dashboard_aggregates', table_name='zimmo_listings',
+                            top_cities=20, quantiles=DASHBOARD_QUANTILES):
+        totals_query = f"""
+        SELECT n, price_sum, price_sum_sq FROM {aggregates_table}
+        WHERE dimension = 'all' AND group_key = ''
+        """
+        groups_query = f"""
+        SELECT dimension, group_key, n FROM (
+            SELECT dimension, group_key, n,
+                   ROW_NUMBER() OVER (PARTITION BY dimension ORDER BY n DESC, group_key) AS rank
+            FROM {aggregates_table}
+            WHERE dimension IN ('type', 'city') AND n > 0
+        ) ranked
+        WHERE dimension = 'type' OR rank <= %s
+        ORDER BY dimension, rank
+        """
+        range_query = f"""
+        SELECT
+            (SELECT price FROM {table_name} WHERE price IS NOT NULL ORDER BY price LIMIT 1),
+            (SELECT price FROM {table_name} WHERE price IS NOT NULL ORDER BY price DESC LIMIT 1)
+        """
+        try:
+            with self.db.connection() as conn, conn.cursor() as cur:
+                self.seed_dashboard_aggregates(cur, aggregates_table=aggregates_table)
+            totals = self.db.get_first(totals_query) or (0, 0, 0)
+            groups = self.db.get_records(groups_query, parameters=(top_cities,))
+            sketches = self.get_sketches(aggregates_table=aggregates_table)
+            min_price, max_price = self.db.get_first(range_query)
+        except Exception as e:
+            print(f"❌ Computing dashboard statistics failed: {e}")
+            raise
+
+        def as_float(value):
+            return float(value) if value is not None else None
+
+        count, total, total_sq = int(totals[0]), float(totals[1] or 0), float(totals[2] or 0)
+        std = None
+        if count > 1:
+            std = math.sqrt(max(0.0, (total_sq - total * total / count) / (count - 1)))
+        price_quantiles = sketches.get("price", QuantileSketch()).quantiles(quantiles)
+        return {
+            "count": count,
+            "avg": total / count if count else None,
+            "min": as_float(min_price),
+            "max": as_float(max_price),
+            "median": price_quantiles.get("p50"),
+            "std": std,
+            "quantiles": price_quantiles,
+            "price_per_m2_quantiles": sketches.get("price_per_m2", QuantileSketch()).quantiles(quantiles),
+            "property_types": {key: int(n) for dimension, key, n in groups if dimension == 'type'},
+            "cities": {str(key): int(n) for dimension, key, n in groups if dimension == 'city'}
+        }
+
+    def refresh_stats_views(self, views=STATS_VIEWS):
+        """Refresh each statistics view CONCURRENTLY, so readers keep the old rows until the new ones are in."""
+        for view in views:
+            started = time.time()
+            try:
+                with self.db.connection() as conn, conn.cursor() as cur:
+                    cur.execute("SELECT ispopulated FROM pg_matviews WHERE matviewname = %s", (view,))
+                    populated = cur.fetchone()
+                    concurrently = "CONCURRENTLY " if populated and populated[0] else ""
+                    cur.execute(f"REFRESH MATERIALIZED VIEW {concurrently}{view}")
+                print(f"🔄 Refreshed {concurrently.lower()}{view} in {time.time() - started:.1f}s")
+            except Exception as e:
+                print(f"❌ Refreshing {view} failed: {e}")
+                raise
+        return len(views)
+
+    def count(self, table_name=None, where=None, params=None):
+        query = self.build_select(table_name, ["COUNT(*)"], where)
+        try:
+            return self.db.get_first(query, parameters=params)[0]
+        except Exception as e:
+            print(f"❌ Counting rows failed: {e}")
+            raise
     
+    def get_watermarks(self, category_type):
+        query = "SELECT price_range, last_zimmo_code FROM crawl_watermark WHERE category_type = %s;"
+        try:
+            records = self.db.get_records(query, parameters=(category_type,))
+            return {price_range: code for price_range, code in records}
+        except Exception as e:
+            print(f"⚠️ Could not load crawl watermarks: {e}")
+            return {}
+
+    def save_watermark(self, category_type, price_range, zimmo_code):
+        query = """
+        INSERT INTO crawl_watermark (category_type, price_range, last_zimmo_code, updated_at)
+        VALUES (%s, %s, %s, CURRENT_TIMESTAMP)
+        ON CONFLICT (category_type, price_range) DO UPDATE SET
+            last_zimmo_code = EXCLUDED.last_zimmo_code,
+            updated_at = EXCLUDED.updated_at
+        """
+        try:
+            self.db.run(query, parameters=(category_type, price_range, zimmo_code))
+        except Exception as e:
+            print(f"⚠️ Could not save crawl watermark for {price_range}: {e}")
+
+    def get_frontier(self, run_key, category_type):
+        query = """
+        SELECT kind, url, price_range, page, status, properties
+        FROM crawl_frontier
+        WHERE run_key = %s AND category_type = %s;
+        """
+        try:
+            return self.db.get_records(query, parameters=(run_key, category_type))
+        except Exception as e:
+            print(f"⚠️ Could not load crawl frontier for {run_key}: {e}")
+            return []
+
+    def save_frontier(self, run_key, category_type, rows):
+        if not rows:
+            return
+        query = """
+        INSERT INTO crawl_frontier (run_key, category_type, kind, url, price_range, page, status, properties)
+        VALUES %s
+        ON CONFLICT (run_key, category_type, kind, url) DO UPDATE SET
+            page = EXCLUDED.page,
+            status = EXCLUDED.status,
+            properties = EXCLUDED.properties,
+            attempts = crawl_frontier.attempts + 1,
+            updated_at = CURRENT_TIMESTAMP
+        """
+        values = [(run_key, category_type) + tuple(row) for row in rows]
+        try:
+            with self.db.connection() as conn, conn.cursor() as cur:
+                execute_values(cur, query, values, page_size=500)
+        except Exception as e:
+            print(f"⚠️ Could not save crawl frontier: {e}")
+
+    def prune_frontier(self, category_type, keep_days):
+        query = """
+        DELETE FROM crawl_frontier
+        WHERE category_type = %s AND updated_at < CURRENT_TIMESTAMP - make_interval(days => %s);
+        """
+        try:
+            self.db.run(query, parameters=(category_type, keep_days))
+        except Exception as e:
+            print(f"⚠️ Could not prune crawl frontier: {e}")
+
     def save_summary_to_db(self, summary_data):
         try:
             summary_row = [
@@ -127,7 +587,7 @@ class Output:
                 category_type, total_properties, price_ranges_scraped, duration_seconds
             ) VALUES (%s, %s, %s, %s)
             """
-            self.postgres_hook.run(query, parameters=summary_row)
+            self.db.run(query, parameters=summary_row)
             print(f"📊 Saved summary to scrape_summary table: {summary_row}")
         
         except Exception as e:
@@ -0,0 +1,148 @@
+import json
+import os
+import threading
+from datetime import datetime
+from utils.config import (
+    PARTITION_STATE_DIR, PARTITION_MIN_RESULTS, PARTITION_MAX_RESULTS,
+    PARTITION_MIN_WIDTH, PARTITION_MAX_RANGES, PARTITION_START, PARTITION_MAX_LIMIT, PARTITION_STEP
+)
+
+
+class PricePartitioner:
+    """Balances price ranges by result count and remembers the boundaries per category.
+
+    Overloaded ranges are bisected and sparse neighbours are merged. Counts
+    reported by the crawl are stored with the boundaries, so a later run only
+    probes ranges whose count is unknown. Plans longer than max_ranges are
+    shortened by merging the emptiest neighbours, so no price band is dropped.
+    """
+
+    def __init__(self, category_type, probe=None, state_dir=PARTITION_STATE_DIR,
+                 min_results=PARTITION_MIN_RESULTS, max_results=PARTITION_MAX_RESULTS,
+                 min_width=PARTITION_MIN_WIDTH, max_ranges=PARTITION_MAX_RANGES):
+        self.category_type = category_type
+        self.probe = probe
+        self.min_results = min_results
+        self.max_results = max_results
+        self.min_width = min_width
+        self.max_ranges = max_ranges
+        self.path = os.path.join(state_dir, f"price_partitions_{category_type.lower()}.json")
+        self.lock = threading.Lock()
+        self.ranges = []
+
+    def default_ranges(self):
+        ranges = []
+        current = PARTITION_START
+        while current + PARTITION_STEP - 1 <= PARTITION_MAX_LIMIT:
+            ranges.append([current, current + PARTITION_STEP - 1, None])
+            current += PARTITION_STEP
+        ranges.append([PARTITION_MAX_LIMIT + 1, None, None])
+        return ranges
+
+    def load(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path) as f:
+                    self.ranges = json.load(f)["ranges"]
+                print(f"📐 Loaded {len(self.ranges)} learned price ranges for {self.category_type}")
+                return self.ranges
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ Could not read learned price ranges, using defaults: {e}")
+        self.ranges = self.default_ranges()
+        return self.ranges
+
+    def save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with self.lock, open(tmp_path, "w") as f:
+                json.dump({
+                    "category_type": self.category_type,
+                    "updated_at": datetime.now().isoformat(),
+                    "ranges": self.ranges
+                }, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ Could not save learned price ranges: {e}")
+
+    def count(self, min_price, max_price):
+        if self.probe is None:
+            return None
+        return self.probe(min_price, max_price)
+
+    def split_point(self, min_price, max_price):
+        if max_price is None:
+            return max(min_price * 2, min_price + self.min_width)
+        return (min_price + max_price + 1) // 2
+
+    def can_split(self, min_price, max_price):
+        if max_price is None:
+            return True
+        return max_price - min_price + 1 >= 2 * self.min_width
+
+    def split(self, min_price, max_price, count):
+        if count is None or count <= self.max_results or not self.can_split(min_price, max_price):
+            return [[min_price, max_price, count]]
+
+        mid = self.split_point(min_price, max_price)
+        lower_count = self.count(min_price, mid - 1)
+        upper_count = count - lower_count if lower_count is not None else self.count(mid, max_price)
+        if lower_count is None or upper_count is None:
+            return [[min_price, max_price, count]]
+
+        print(f"✂️ Splitting {min_price} - {max_price} ({count} results) at {mid}")
+        return (self.split(min_price, mid - 1, lower_count)
+                + self.split(mid, max_price, max(0, upper_count)))
+
+    def merge(self, ranges):
+        merged = []
+        for min_price, max_price, count in ranges:
+            if merged:
+                prev = merged[-1]
+                sparse = (prev[2] is not None and count is not None
+                          and (prev[2] < self.min_results or count < self.min_results)
+                          and prev[2] + count <= self.max_results)
+                if sparse:
+                    prev[1] = max_price
+                    prev[2] += count
+                    continue
+            merged.append([min_price, max_price, count])
+        return merged
+
+    def cap(self, ranges):
+        ranges = [list(price_range) for price_range in ranges]
+
+        def cost(i):
+            (low, _, left), (_, high, right) = ranges[i], ranges[i + 1]
+            count = left + right if left is not None and right is not None else float("inf")
+            width = high - low if high is not None else float("inf")
+            return count, width
+
+        while self.max_ranges and len(ranges) > self.max_ranges:
+            i = min(range(len(ranges) - 1), key=cost)
+            left, right = ranges[i], ranges.pop(i + 1)
+            count = left[2] + right[2] if left[2] is not None and right[2] is not None else None
+            print(f"🧩 Merging {left[0]} - {left[1]} and {right[0]} - {right[1]} "
+                  f"to stay within {self.max_ranges} price ranges")
+            ranges[i] = [left[0], right[1], count]
+        return ranges
+
+    def plan(self):
+        ranges = []
+        for min_price, max_price, count in self.load():
+            if count is None:
+                count = self.count(min_price, max_price)
+            ranges.extend(self.split(min_price, max_price, count))
+
+        self.ranges = self.cap(self.merge(ranges))
+        self.save()
+        print(f"📐 Planned {len(self.ranges)} price ranges for {self.category_type}")
+        return [(min_price, max_price) for min_price, max_price, _ in self.ranges]
+
+    def record_count(self, min_price, max_price, count):
+        if count is None:
+            return
+        with self.lock:
+            for price_range in self.ranges:
+                if price_range[0] == min_price and price_range[1] == max_price:
+                    price_range[2] = count
@@ -1,112 +1,247 @@
+import queue
 import threading
 import time
 from datetime import datetime
 from utils.scraper import Scraper
-from utils.scrapethread import ScrapeThread
 from utils.output import Output
+from utils.session_pool import SessionPool
+from utils.known_index import KnownListingIndex
+from utils.crawl_frontier import CrawlFrontier
+from utils.scrape_pipeline import ScrapePipeline
+from utils.config import (
+    FETCH_CONCURRENCY, RANGE_WORKERS, INCREMENTAL_PAGING,
+    INCREMENTAL_MAX_PAGES, INCREMENTAL_STOP_AFTER_KNOWN
+)
 from utils.url_generator import URLgenerator
+from utils.price_partitioner import PricePartitioner
 from utils.alternative_scraper import AlternativeScraper    
+from urllib.parse import urljoin
 import os
 
 class PropertyScraper:
-    def __init__(self, category_type, max_workers=None, db_uri=None ):
-        self.max_workers = 2
-        self.max_price_ranges = 50
-        self.max_pages_per_range = 1
+    def __init__(self, category_type, max_workers=None, db_uri=None, range_workers=None,
+                 incremental=INCREMENTAL_PAGING, run_key=None):
+        self.max_workers = max_workers or FETCH_CONCURRENCY
+        self.range_workers = range_workers or RANGE_WORKERS
+        self.incremental = incremental
+        self.stop_after_known = INCREMENTAL_STOP_AFTER_KNOWN
+        self.max_pages_per_range = INCREMENTAL_MAX_PAGES if incremental else 1
+        self.watermarks = {}
         self.db_uri = db_uri
-        self.scraper = None
         self.output = None
+        self.known_index = None
         self.results_lock = threading.Lock()
+        self.total_scraped = 0
         self.base_url = {}
+        self.price_ranges = {}
+        self.partitioner = None
+        self.run_key = run_key
+        self.result_counts = {}
+        self.frontier = None
         self.category_type = category_type
         
     
     def get_base_url(self):
+        resumed = self.frontier.get_ranges() if self.frontier is not None else {}
+        if resumed:
+            self.partitioner = PricePartitioner(self.category_type)
+            self.partitioner.load()
+            self.price_ranges = {}
+            self.base_url = resumed
+            print(f"🧭 Reusing {len(resumed)} price ranges planned by run {self.frontier.run_key}")
+            return
+
         url_generator = URLgenerator(category_type=self.category_type)
-        urls_dict = url_generator.generate_url_with_price(0, 1400000, 50000)
-        limited_items = list(urls_dict.items())[: self.max_price_ranges]
-        self.base_url = dict(limited_items)
+        scraper = self.create_scraper()
+
+        def probe(min_price, max_price):
+            soup = scraper.open_page(url_generator.generate_zimmo_url(min_price, max_price))
+            return scraper.get_result_count(soup) if soup is not None else None
+
+        try:
+            self.partitioner = PricePartitioner(self.category_type, probe=probe)
+            try:
+                price_ranges = self.partitioner.plan()
+            except Exception as e:
+                print(f"⚠️ Probing price ranges failed, using stored ranges without probing: {e}")
+                self.partitioner = PricePartitioner(self.category_type)
+                price_ranges = self.partitioner.plan()
+        finally:
+            scraper.close()
+
+        self.price_ranges = {URLgenerator.range_key(*price_range): price_range for price_range in price_ranges}
+        self.base_url = url_generator.generate_url_for_ranges(price_ranges, newest_first=self.incremental)
+        if self.frontier is not None:
+            self.frontier.add_ranges(self.base_url)
 
         
-    def get_properties_each_page(self, properties_url):
-        from concurrent.futures import ThreadPoolExecutor, as_completed
-        results = {}
-
-        def run_one(url):
-            t = ScrapeThread(url, results, self.results_lock, self.category_type)
-            t.start()
-            t.join()
-
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = [executor.submit(run_one, url) for url in properties_url]
-            for _ in as_completed(futures):
-                pass
-        return results
-    
-    def scrape_price_range(self, key, url, first_write=True):
-        self.setup()
-        page = 1
-        total_properties = 0
+    def reached_seen_inventory(self, key, links, known):
+        watermark = self.watermarks.get(key)
+        known_run = 0
+        for _, code in links:
+            if watermark and code == watermark:
+                print(f"🔖 Reached last run's newest listing {watermark} in price range: {key}")
+                return True
+            known_run = known_run + 1 if code in known else 0
+            if known_run >= self.stop_after_known:
+                print(f"🔖 {known_run} known listings in a row in price range: {key}")
+                return True
+        return False
+
+    def add_scraped(self, count):
+        with self.results_lock:
+            self.total_scraped += count
+        if count:
+            print(f"🗃️ Total properties scraped so far: {self.total_scraped}")
+
+    def scrape_price_range(self, key, url):
+        scraper = self.create_scraper()
+        page = self.frontier.resume_page(key)
+        resumed_properties = self.frontier.resumed_properties(key)
+        newest_code = None
+        complete = False
+        if page > 1:
+            print(f"🧭 Resuming price range {key} at page {page}")
         
-        while True:
-            current_url = self.scraper.update_page_number(page, url)
-            soup = self.scraper.open_page(current_url)
-            
-            if not soup:
-                print(f"⚠️ Could not open page {page} for price range: {key}")
-                break
+        pipeline = ScrapePipeline(
+            scraper, key, self.frontier,
+            start_page=page,
+            known_index=self.known_index,
+            on_saved=self.add_scraped
+        ).start()
+        try:
+            while True:
+                current_url = scraper.update_page_number(page, url)
+                soup = scraper.open_page(current_url)
                 
-            properties_url = self.scraper.get_links(soup)
-            
-            if not properties_url:
-                print(f"🏷️ Done scraping listings in price range: {key}")
-                break
+                if soup is None:
+                    print(f"⚠️ Could not open page {page} for price range: {key}")
+                    break
+                    
+                if page == 1:
+                    self.result_counts[key] = scraper.get_result_count(soup)
+                    if key in self.price_ranges:
+                        self.partitioner.record_count(*self.price_ranges[key], self.result_counts[key])
+
+                links = scraper.get_links(soup)
                 
-            results = self.get_properties_each_page(properties_url)
-            
-            if results:
-                self.output.save_to_db(results)
-                first_write = False
-                self.scraper.properties_data.update(results)
-                total_properties += len(results)
+                if not links:
+                    print(f"🏷️ Done scraping listings in price range: {key}")
+                    complete = True
+                    break
+
+                if page == 1:
+                    newest_code = next((code for _, code in links if code), None)
+                    
+                known = scraper.get_known_codes(links)
+                properties_url = [
+                    href for href in scraper.filter_new_links(links, known)
+                    if not self.frontier.is_detail_done(urljoin("https://www.zimmo.be", href))
+                ]
+                pipeline.submit_page(page, current_url, properties_url)
                 
-            print(f"🔎 Done scraping listings in price range: {key} - Page: {page}")
-            print(f"🗃️ Properties scraped this range: {total_properties}")
-            print(f"🗃️ Total properties scraped so far: {len(self.scraper.properties_data)}")
+                if self.incremental and self.reached_seen_inventory(key, links, known):
+                    complete = True
+                    break
+
+                page += 1
+                if page > self.max_pages_per_range:
+                    print(f"🔚 Reached max pages per range ({self.max_pages_per_range}) for {key}")
+                    complete = True
+                    break
+        finally:
+            try:
+                pipeline.close()
+            finally:
+                scraper.close()
+
+        total_properties = resumed_properties + pipeline.total_properties
+        self.frontier.finish_range(key, total_properties, "done" if complete else "failed")
+        if self.incremental and newest_code and complete:
+            self.output.save_watermark(self.category_type, key, newest_code)
             
-            page += 1
-            if page > self.max_pages_per_range:
-                print(f"🔚 Reached max pages per range ({self.max_pages_per_range}) for {key}")
+        return total_properties
+
+    def range_worker(self, work_queue, summary):
+        while True:
+            item = work_queue.get()
+            if item is None:
+                work_queue.task_done()
                 break
+
+            key, url = item
+            print(f"\n🚀 Scraping {self.category_type}: Starting price range: {key}")
+            try:
+                properties_count = self.scrape_price_range(key, url)
+            except Exception as e:
+                print(f"❌ Price range {key} failed: {e}")
+                properties_count = 0
+                self.frontier.finish_range(key, self.frontier.resumed_properties(key), "failed")
+                with self.results_lock:
+                    summary['failed_price_ranges'].append(key)
             
-        return first_write, total_properties
+            with self.results_lock:
+                summary['price_range_results'][key] = properties_count
+                summary['total_properties'] += properties_count
+                summary['price_ranges_scraped'] += 1
+            work_queue.task_done()
+
+    def crawl_price_ranges(self, summary):
+        work_queue = queue.Queue()
+        pending = 0
+        for key, url in self.base_url.items():
+            if self.frontier.is_range_done(key):
+                properties_count = self.frontier.range_properties(key)
+                print(f"⏭️ Price range {key} already finished in this run ({properties_count} properties)")
+                summary['price_range_results'][key] = properties_count
+                summary['total_properties'] += properties_count
+                summary['price_ranges_scraped'] += 1
+                self.total_scraped += properties_count
+                continue
+            work_queue.put((key, url))
+            pending += 1
+
+        worker_count = max(1, min(self.range_workers, pending))
+        for _ in range(worker_count):
+            work_queue.put(None)
+
+        workers = [
+            threading.Thread(target=self.range_worker, args=(work_queue, summary), daemon=True)
+            for _ in range(worker_count)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        summary['price_range_results'] = {
+            key: summary['price_range_results'][key]
+            for key in self.base_url
+            if key in summary['price_range_results']
+        }
     
     def scrape_all_price_ranges(self, filename=None):
 
         self.setup()
 
         start_time = time.perf_counter()
-        first_write = True
         summary = {
             'category_type': self.category_type,
             'total_properties': 0,
             'price_ranges_scraped': 0,
             'start_time': start_time,
-            'price_range_results': {}
+            'price_range_results': {},
+            'failed_price_ranges': []
         }
         
-        self.get_base_url()
-        
         try:
-            for key, url in self.base_url.items():
-                print(f"\n🚀 Scraping {self.category_type}: Starting price range: {key}")
-                first_write, properties_count = self.scrape_price_range(
-                    key, url, first_write
-                )
-                
-                summary['price_range_results'][key] = properties_count
-                summary['total_properties'] += properties_count
-                summary['price_ranges_scraped'] += 1
+            self.frontier = CrawlFrontier(self.output, self.category_type, self.run_key).load()
+            self.get_base_url()
+            self.known_index = KnownListingIndex(self.output).load()
+            if self.incremental:
+                self.watermarks = self.output.get_watermarks(self.category_type)
+            self.crawl_price_ranges(summary)
+            self.partitioner.save()
             
             if summary['total_properties'] == 0:
                 print("⚠️  No properties found from zimmo.be, triggering fallback...")
@@ -114,25 +249,7 @@ class PropertyScraper:
                 
         except Exception as e:
             print(f"❌ Error during zimmo.be scraping: {str(e)}")
-            print("🔄 Falling back to alternative scraper with sample data...")
-            
-            alt_scraper = AlternativeScraper(category_type=self.category_type)
-            try:
-                property_data = alt_scraper.scrape_all_price_ranges()
-                print(f"✅ Alternative scraper provided {len(property_data)} sample properties")
-
-                if property_data:
-                    try:
-                        self.output.save_to_db(property_data, table_name='zimmo_data_sample')
-                        summary['total_properties'] = len(property_data)
-                        summary['price_ranges_scraped'] = 1
-                        summary['price_range_results']['sample_data'] = len(property_data)
-                        print(f"💾 Saved {len(property_data)} sample properties to database table 'zimmo_data_sample'")
-                    except Exception as db_error:
-                        print(f"⚠️  Database save failed (likely duplicates): {db_error}")
-                
-            finally:
-                alt_scraper.cleanup()
+            self.run_fallback(summary)
             
         finally:
             end_time = time.perf_counter()
@@ -145,16 +262,130 @@ class PropertyScraper:
             return summary
         
     
+    def run_fallback(self, summary):
+        print("🔄 Falling back to alternative scraper with sample data...")
+        
+        alt_scraper = AlternativeScraper(category_type=self.category_type)
+        try:
+            property_data = alt_scraper.scrape_all_price_ranges()
+            print(f"✅ Alternative scraper provided {len(property_data)} sample properties")
+
+            if property_data:
+                try:
+                    self.output.save_to_db(property_data, table_name='zimmo_data_sample', history_table=None,
+                                           aggregates_table=None)
+                    summary['total_properties'] = len(property_data)
+                    summary['price_ranges_scraped'] = 1
+                    summary['price_range_results']['sample_data'] = len(property_data)
+                    print(f"💾 Saved {len(property_data)} sample properties to database table 'zimmo_data_sample'")
+                except Exception as db_error:
+                    print(f"⚠️  Database save failed (likely duplicates): {db_error}")
+            
+        finally:
+            alt_scraper.cleanup()
+
+    def plan_price_ranges(self):
+        self.setup()
+        self.frontier = CrawlFrontier(self.output, self.category_type, self.run_key).load()
+        self.get_base_url()
+        self.partitioner.save()
+        
+        plan = []
+        for key, url in self.base_url.items():
+            min_price, max_price = self.price_ranges.get(key, (None, None))
+            plan.append({
+                'category_type': self.category_type,
+                'range_key': key,
+                'url': url,
+                'min_price': min_price,
+                'max_price': max_price
+            })
+        return plan
+
+    def scrape_single_range(self, key, url):
+        self.setup()
+        started_at = time.time()
+        self.frontier = CrawlFrontier(self.output, self.category_type, self.run_key).load()
+        result = {
+            'category_type': self.category_type,
+            'range_key': key,
+            'properties': self.frontier.range_properties(key),
+            'result_count': None,
+            'started_at': started_at
+        }
+        
+        if not self.frontier.is_range_done(key):
+            if self.incremental:
+                self.watermarks = self.output.get_watermarks(self.category_type)
+            try:
+                result['properties'] = self.scrape_price_range(key, url)
+            except Exception:
+                self.frontier.finish_range(key, self.frontier.resumed_properties(key), "failed")
+                raise
+            if not self.frontier.is_range_done(key):
+                raise Exception(f"Price range {key} stopped before its last page")
+            result['result_count'] = self.result_counts.get(key)
+        else:
+            print(f"⏭️ Price range {key} already finished in this run")
+        
+        result['finished_at'] = time.time()
+        return result
+
+    @staticmethod
+    def summarize_ranges(plan, results):
+        summaries = {}
+        for item in plan:
+            summary = summaries.setdefault(item['category_type'], {
+                'category_type': item['category_type'],
+                'total_properties': 0,
+                'price_ranges_scraped': 0,
+                'price_range_results': {},
+                'failed_price_ranges': [],
+                'start_time': None,
+                'end_time': None
+            })
+            summary['failed_price_ranges'].append(item['range_key'])
+            
+        for result in results:
+            summary = summaries[result['category_type']]
+            summary['failed_price_ranges'].remove(result['range_key'])
+            summary['price_range_results'][result['range_key']] = result['properties']
+            summary['total_properties'] += result['properties']
+            summary['price_ranges_scraped'] += 1
+            summary['start_time'] = min(filter(None, [summary['start_time'], result['started_at']]))
+            summary['end_time'] = max(filter(None, [summary['end_time'], result['finished_at']]))
+            
+        for summary in summaries.values():
+            if summary['start_time'] is not None:
+                summary['duration'] = summary['end_time'] - summary['start_time']
+            else:
+                summary['duration'] = 0
+        return summaries
+
+    def record_result_counts(self, plan, results):
+        counts = {result['range_key']: result['result_count'] for result in results
+                  if result['category_type'] == self.category_type}
+        partitioner = PricePartitioner(self.category_type)
+        partitioner.load()
+        for item in plan:
+            if item['category_type'] == self.category_type and item['min_price'] is not None:
+                partitioner.record_count(item['min_price'], item['max_price'], counts.get(item['range_key']))
+        partitioner.save()
+
+    def create_scraper(self):
+        return Scraper(
+            self.category_type,
+            concurrency=self.max_workers,
+            known_index=self.known_index
+        )
+
     def setup(self):
-        from utils.scraper import Scraper
         from utils.output import Output
     
-        self.scraper = Scraper(self.category_type)
         self.output = Output(postgres_conn_id='postgres_default')
             
     def cleanup(self):
-        if self.scraper:
-            self.scraper.close()
+        SessionPool.shared().close_all()
             
     def get_summary_report(self, summary):
         report = f"""
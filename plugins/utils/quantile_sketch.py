@@ -0,0 +1,69 @@
+import math
+from utils.config import DASHBOARD_SKETCH_ACCURACY
+
+
+class QuantileSketch:
+    """Log-bucketed quantile sketch (DDSketch style) with a fixed relative error.
+
+    A value x > 0 is counted in bucket ceil(log(x) / log(gamma)), and every
+    quantile is returned within `accuracy` of the true value. Buckets are plain
+    counts, so two sketches merge by adding counts and a value is retracted by
+    decrementing its bucket, which lets stored sketches follow price changes.
+    """
+
+    def __init__(self, accuracy=DASHBOARD_SKETCH_ACCURACY, buckets=None):
+        self.accuracy = accuracy
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        for index, count in (buckets or {}).items():
+            self.add_bucket(int(index), int(count))
+
+    def bucket(self, value):
+        return math.ceil(math.log(value) / self.log_gamma)
+
+    def bucket_sql(self, expression):
+        return f"CEIL(LN({expression}) / {self.log_gamma!r})::INTEGER"
+
+    def value(self, index):
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def add_bucket(self, index, count):
+        count = self.buckets.get(index, 0) + count
+        if count > 0:
+            self.buckets[index] = count
+        else:
+            self.buckets.pop(index, None)
+
+    def add(self, value, count=1):
+        if value is not None and value > 0:
+            self.add_bucket(self.bucket(value), count)
+
+    def remove(self, value, count=1):
+        self.add(value, -count)
+
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with a different accuracy")
+        for index, count in other.buckets.items():
+            self.add_bucket(index, count)
+        return self
+
+    @property
+    def count(self):
+        return sum(self.buckets.values())
+
+    def quantile(self, q):
+        total = self.count
+        if not total:
+            return None
+        rank = q * (total - 1)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                return self.value(index)
+        return self.value(max(self.buckets))
+
+    def quantiles(self, qs):
+        return {f"p{round(q * 100)}": self.quantile(q) for q in qs}
@@ -0,0 +1,62 @@
+import asyncio
+import fcntl
+import json
+import os
+import time
+from urllib.parse import urlparse
+from utils.config import RATE_LIMITS, RATE_LIMIT_DEFAULT, RATE_LIMIT_STATE_DIR
+
+
+class RateLimiter:
+    """Token bucket per host, shared across threads and processes through a locked state file."""
+
+    def __init__(self, state_dir=RATE_LIMIT_STATE_DIR, limits=None):
+        self.state_dir = state_dir
+        self.limits = limits if limits is not None else RATE_LIMITS
+        os.makedirs(self.state_dir, exist_ok=True)
+
+    @staticmethod
+    def get_host(url_or_host):
+        parsed = urlparse(url_or_host)
+        return parsed.hostname or url_or_host
+
+    def get_limit(self, host):
+        limit = self.limits.get(host, RATE_LIMIT_DEFAULT)
+        return float(limit["rate"]), float(limit["burst"])
+
+    def reserve(self, url_or_host):
+        host = self.get_host(url_or_host)
+        rate, burst = self.get_limit(host)
+        path = os.path.join(self.state_dir, f"{host}.bucket")
+
+        with open(path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                raw = f.read()
+                now = time.time()
+                state = json.loads(raw) if raw else {"tokens": burst, "updated": now}
+
+                elapsed = max(0.0, now - state["updated"])
+                tokens = min(burst, state["tokens"] + elapsed * rate) - 1
+
+                f.seek(0)
+                f.truncate()
+                json.dump({"tokens": tokens, "updated": now}, f)
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+        return max(0.0, -tokens / rate)
+
+    def acquire(self, url_or_host):
+        wait = self.reserve(url_or_host)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, url_or_host):
+        wait = self.reserve(url_or_host)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
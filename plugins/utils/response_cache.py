@@ -0,0 +1,164 @@
+import hashlib
+import os
+import sqlite3
+import time
+from utils.config import HTTP_CACHE_DIR, HTTP_CACHE_TTL, HTTP_CACHE_MAX_BYTES
+
+
+class CachedResponse:
+    def __init__(self, body, body_hash, unchanged):
+        self.body = body
+        self.body_hash = body_hash
+        self.unchanged = unchanged
+
+
+class ResponseCache:
+    """On-disk HTTP cache keyed by URL, with bodies stored by content hash.
+
+    A response counts as unchanged when its body hash equals the hash that
+    was last marked processed for that URL, so callers can skip parsing and
+    DB writes for it.
+    """
+
+    def __init__(self, cache_dir=HTTP_CACHE_DIR, ttl=HTTP_CACHE_TTL, max_bytes=HTTP_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.index_path = os.path.join(cache_dir, "index.sqlite")
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    url TEXT PRIMARY KEY,
+                    body_hash TEXT NOT NULL,
+                    processed_hash TEXT,
+                    etag TEXT,
+                    last_modified TEXT,
+                    size INTEGER NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.index_path, timeout=30)
+
+    def _object_path(self, body_hash):
+        return os.path.join(self.objects_dir, body_hash[:2], body_hash)
+
+    def _get_entry(self, conn, url):
+        row = conn.execute(
+            "SELECT body_hash, processed_hash, etag, last_modified FROM entries WHERE url = ?",
+            (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"body_hash": row[0], "processed_hash": row[1], "etag": row[2], "last_modified": row[3]}
+
+    def conditional_headers(self, url):
+        with self._connect() as conn:
+            entry = self._get_entry(conn, url)
+        if entry is None or not os.path.exists(self._object_path(entry["body_hash"])):
+            return {}
+        headers = {}
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url, status_code, headers, body):
+        now = time.time()
+        with self._connect() as conn:
+            entry = self._get_entry(conn, url)
+
+            if status_code == 304:
+                if entry is None:
+                    return None
+                path = self._object_path(entry["body_hash"])
+                if not os.path.exists(path):
+                    return None
+                with open(path, "rb") as f:
+                    body = f.read()
+                conn.execute(
+                    "UPDATE entries SET fetched_at = ?, accessed_at = ? WHERE url = ?",
+                    (now, now, url)
+                )
+                return CachedResponse(body, entry["body_hash"], entry["body_hash"] == entry["processed_hash"])
+
+            body_hash = hashlib.sha256(body).hexdigest()
+            path = self._object_path(body_hash)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(body)
+                os.replace(tmp_path, path)
+
+            conn.execute("""
+                INSERT INTO entries (url, body_hash, processed_hash, etag, last_modified, size, fetched_at, accessed_at)
+                VALUES (?, ?, NULL, ?, ?, ?, ?, ?)
+                ON CONFLICT (url) DO UPDATE SET
+                    body_hash = excluded.body_hash,
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    size = excluded.size,
+                    fetched_at = excluded.fetched_at,
+                    accessed_at = excluded.accessed_at
+            """, (url, body_hash, headers.get("ETag"), headers.get("Last-Modified"), len(body), now, now))
+
+            if entry is not None and entry["body_hash"] != body_hash:
+                self._remove_orphans(conn, [entry["body_hash"]])
+
+            unchanged = entry is not None and entry["processed_hash"] == body_hash
+            return CachedResponse(body, body_hash, unchanged)
+
+    def mark_processed(self, urls):
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE entries SET processed_hash = body_hash WHERE url = ?",
+                [(url,) for url in urls]
+            )
+
+    def _remove_orphans(self, conn, body_hashes):
+        removed = []
+        for body_hash in body_hashes:
+            still_used = conn.execute(
+                "SELECT 1 FROM entries WHERE body_hash = ? LIMIT 1", (body_hash,)
+            ).fetchone()
+            if still_used is None:
+                try:
+                    os.remove(self._object_path(body_hash))
+                except FileNotFoundError:
+                    pass
+                removed.append(body_hash)
+        return removed
+
+    def evict(self):
+        cutoff = time.time() - self.ttl
+        with self._connect() as conn:
+            expired = [row[0] for row in conn.execute(
+                "SELECT DISTINCT body_hash FROM entries WHERE fetched_at < ?", (cutoff,)
+            )]
+            conn.execute("DELETE FROM entries WHERE fetched_at < ?", (cutoff,))
+            self._remove_orphans(conn, expired)
+
+            total = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM (SELECT body_hash, MAX(size) AS size FROM entries GROUP BY body_hash)"
+            ).fetchone()[0]
+            if total <= self.max_bytes:
+                return
+
+            evicted = 0
+            for url, body_hash, size in conn.execute(
+                "SELECT url, body_hash, size FROM entries ORDER BY accessed_at"
+            ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+                evicted += 1
+                # a body shared with other URLs stays on disk and still counts
+                if self._remove_orphans(conn, [body_hash]):
+                    total -= size
+        print(f"🧹 Evicted {evicted} cached responses to stay under {self.max_bytes} bytes")
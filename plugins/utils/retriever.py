@@ -1,7 +1,15 @@
 import re
 class Retriever:
-    def __init__(self, soup):
+    def __init__(self, soup, url=None):
         self.soup = soup
+        self.url = url or ""
+
+    @staticmethod
+    def get_zimmo_code_from_url(url):
+        match = re.search(r'/(?:huis|appartement)/([A-Z0-9]+)/', url or "")
+        if match:
+            return match.group(1).strip()
+        return None
     
     def get_zimmo_code(self):
         zimmo_code_elem = self.soup.find("p", class_="zimmo-code")
@@ -11,14 +19,7 @@ class Retriever:
                 code = code.split(":", 1)[1].strip()
             if code:
                 return code
-        if "appartement" in self.url:
-            match = re.search(r'/appartement/([A-Z0-9]+)/', self.url)
-        else:
-            match = re.search(r'/huis/([A-Z0-9]+)/', self.url)
-        if match:
-            return match.group(1).strip()
-
-        return None
+        return self.get_zimmo_code_from_url(self.url)
 
     def get_feature_info(self):
         main_features_section = (self.soup.find("section", id="main-features") or 
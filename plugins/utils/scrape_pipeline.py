@@ -0,0 +1,226 @@
+import queue
+import threading
+import time
+from utils.retriever import Retriever
+from utils.config import (
+    PIPELINE_QUEUE_SIZE, PIPELINE_PARSE_WORKERS, PIPELINE_BATCH_SIZE, PIPELINE_FLUSH_INTERVAL
+)
+
+STOP = object()
+
+
+class ScrapePipeline:
+    """Fetch, parse and write stages for one price range, joined by bounded queues.
+
+    A full queue blocks the stage feeding it, so memory is bounded by the
+    queue sizes and the writer batch however many listings a range has. The
+    writer flushes after PIPELINE_BATCH_SIZE listings or PIPELINE_FLUSH_INTERVAL
+    seconds, and a search page is only marked finished in the crawl frontier
+    once every listing on it and on the pages before it has been written.
+    """
+
+    def __init__(self, scraper, key, frontier, start_page=1, known_index=None, on_saved=None,
+                 queue_size=PIPELINE_QUEUE_SIZE, parse_workers=PIPELINE_PARSE_WORKERS,
+                 batch_size=PIPELINE_BATCH_SIZE, flush_interval=PIPELINE_FLUSH_INTERVAL):
+        self.scraper = scraper
+        self.key = key
+        self.frontier = frontier
+        self.known_index = known_index
+        self.on_saved = on_saved
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fetch_queue = queue.Queue(maxsize=queue_size)
+        self.parse_queue = queue.Queue(maxsize=queue_size)
+        self.write_queue = queue.Queue(maxsize=queue_size)
+        self.stopped = threading.Event()
+        self.lock = threading.Lock()
+        self.finish_lock = threading.Lock()
+        self.error = None
+        self.pages = {}
+        self.next_page = start_page
+        self.total_properties = 0
+        self.fetch_thread = threading.Thread(target=self.fetch_stage, daemon=True)
+        self.parse_threads = [
+            threading.Thread(target=self.parse_stage, daemon=True) for _ in range(max(1, parse_workers))
+        ]
+        self.write_thread = threading.Thread(target=self.write_stage, daemon=True)
+        self.closed = False
+
+    def start(self):
+        self.fetch_thread.start()
+        for thread in self.parse_threads:
+            thread.start()
+        self.write_thread.start()
+        return self
+
+    def fail(self, error):
+        with self.lock:
+            if self.error is None:
+                self.error = error
+        self.stopped.set()
+
+    def raise_if_failed(self):
+        if self.error is not None:
+            raise self.error
+
+    def put(self, target, item):
+        while not self.stopped.is_set():
+            try:
+                target.put(item, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def pass_on_stop(self, source):
+        try:
+            source.put_nowait(STOP)
+        except queue.Full:
+            pass
+
+    def get(self, source, timeout=None):
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while not self.stopped.is_set():
+            wait = 1 if deadline is None else min(1, deadline - time.monotonic())
+            if wait <= 0:
+                raise queue.Empty
+            try:
+                return source.get(timeout=wait)
+            except queue.Empty:
+                continue
+        return STOP
+
+    def submit_page(self, page, url, links):
+        pending = self.scraper.claim_links(links)
+        with self.lock:
+            self.pages[page] = {"url": url, "pending": len(pending), "properties": 0}
+        if not pending:
+            self.finish_ready_pages()
+        for link, full_link in pending:
+            if not self.put(self.fetch_queue, (page, link, full_link)):
+                break
+        self.raise_if_failed()
+
+    def fetch_stage(self):
+        def receive():
+            item = self.get(self.fetch_queue)
+            if item is STOP:
+                self.pass_on_stop(self.fetch_queue)
+                return None
+            page, link, full_link = item
+            return full_link, (page, link, full_link)
+
+        def emit(tag, response):
+            self.put(self.parse_queue, tag + (response,))
+
+        try:
+            self.scraper.get_fetcher().stream(receive, emit, headers_factory=self.scraper.get_detail_headers)
+        except Exception as e:
+            self.fail(e)
+
+    def parse_stage(self):
+        while True:
+            item = self.get(self.parse_queue)
+            if item is STOP:
+                self.pass_on_stop(self.parse_queue)
+                return
+            page, link, full_link, response = item
+            try:
+                parsed = None
+                if response is not None and response.unchanged:
+                    print(f"♻️ Unchanged since last run, skipped parsing: {full_link}")
+                    parsed = (Retriever.get_zimmo_code_from_url(full_link), None)
+                elif response is not None:
+                    parsed = self.scraper.process_soup(response.body, link)
+                self.put(self.write_queue, (page, link, full_link, response is not None, parsed))
+            except Exception as e:
+                self.fail(e)
+                return
+
+    def write_stage(self):
+        batch = []
+        flush_at = None
+        try:
+            while True:
+                timeout = None if flush_at is None else max(0, flush_at - time.monotonic())
+                try:
+                    item = self.get(self.write_queue, timeout=timeout)
+                except queue.Empty:
+                    item = None
+
+                if item is STOP:
+                    self.flush(batch)
+                    return
+                if item is not None:
+                    batch.append(item)
+                    if flush_at is None:
+                        flush_at = time.monotonic() + self.flush_interval
+
+                parsed_count = sum(1 for *_, parsed in batch if parsed and parsed[1])
+                if batch and (parsed_count >= self.batch_size or time.monotonic() >= flush_at):
+                    self.flush(batch)
+                    batch = []
+                    flush_at = None
+        except Exception as e:
+            self.fail(e)
+
+    def flush(self, batch):
+        if not batch or self.stopped.is_set():
+            return
+
+        results = {}
+        for page, link, full_link, fetched, parsed in batch:
+            if parsed:
+                zimmo_code, data = parsed
+                if zimmo_code and data:
+                    data["type"] = self.scraper.category_type
+                    results[zimmo_code] = data
+
+        seen = [parsed[0] for *_, parsed in batch if parsed and parsed[0] and parsed[1] is None]
+        if results:
+            self.scraper.output.save_to_db(results)
+        if seen:
+            self.scraper.output.mark_seen(seen)
+        if self.known_index is not None:
+            self.known_index.add(list(results) + seen)
+        self.scraper.mark_processed([link for _, link, _, fetched, _ in batch if fetched])
+        self.frontier.finish_details(
+            self.key,
+            [full_link for _, _, full_link, fetched, _ in batch if fetched],
+            [full_link for _, _, full_link, fetched, _ in batch if not fetched]
+        )
+
+        with self.lock:
+            for page, link, full_link, fetched, parsed in batch:
+                self.pages[page]["pending"] -= 1
+                if parsed and parsed[0] in results:
+                    self.pages[page]["properties"] += 1
+            self.total_properties += len(results)
+        if self.on_saved is not None:
+            self.on_saved(len(results))
+        self.finish_ready_pages()
+
+    def finish_ready_pages(self):
+        with self.finish_lock:
+            with self.lock:
+                ready = []
+                while self.next_page in self.pages and self.pages[self.next_page]["pending"] == 0:
+                    ready.append((self.next_page, self.pages.pop(self.next_page)))
+                    self.next_page += 1
+            for page, state in ready:
+                self.frontier.finish_page(self.key, state["url"], page, state["properties"])
+                print(f"🔎 Done scraping listings in price range: {self.key} - Page: {page}")
+                print(f"🗃️ Properties scraped this range: {self.total_properties}")
+
+    def close(self):
+        if self.closed:
+            self.raise_if_failed()
+            return
+        self.closed = True
+        for target, threads in ((self.fetch_queue, [self.fetch_thread]),
+                                (self.parse_queue, self.parse_threads),
+                                (self.write_queue, [self.write_thread])):
+            self.put(target, STOP)
+            for thread in threads:
+                thread.join()
+        self.raise_if_failed()
@@ -1,39 +1,44 @@
 import requests
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 import time
 import random
 from utils.cleaner import Cleaner
 from utils.retriever import Retriever
+from utils.extractor import get_extractor
 from utils.output import Output
-from utils.config import ALL_KEYS
-import certifi
+from utils.async_fetcher import AsyncFetcher
+from utils.rate_limiter import RateLimiter
+from utils.session_pool import SessionPool
+from utils.response_cache import ResponseCache
+from utils.config import ALL_KEYS, FETCH_CONCURRENCY, KNOWN_REFRESH_DAYS
 from http.client import RemoteDisconnected
 from fake_useragent import UserAgent
 from datetime import datetime
 from zoneinfo import ZoneInfo
-import cloudscraper
 
 
 class Scraper:
-    def __init__(self, category_type: str, page: int = 1, ):
+    _shared_ua = None
+
+    def __init__(self, category_type: str, page: int = 1, concurrency: int = FETCH_CONCURRENCY, known_index=None,
+                 refresh_days=KNOWN_REFRESH_DAYS):
         self.page = page
+        self.known_index = known_index
+        self.refresh_days = refresh_days
+        self.concurrency = concurrency
+        self.fetcher = None
+        self.rate_limiter = RateLimiter()
+        self.cache = ResponseCache()
+        self.extractor = get_extractor()
         self.category_type = category_type 
         self.output = Output(postgres_conn_id='postgres_default') 
-        self.session = cloudscraper.create_scraper(
-            browser={
-                'browser': 'firefox',
-                'platform': 'linux',  
-                'mobile': False
-            },
-            delay=10,
-            debug=False
-        )
-        self.properties_data = {}
-        self.page_urls = []
+        self.session_pool = SessionPool.shared()
         self.seen_url = set()
         self.seen_zimmo_code = set()
-        self.ua = UserAgent(platforms='desktop')
+        self.unknown_codes = set()
+        if Scraper._shared_ua is None:
+            Scraper._shared_ua = UserAgent(platforms='desktop')
+        self.ua = Scraper._shared_ua
         self.headers = {
             'User-Agent': self.get_user_agent(),
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
@@ -51,7 +56,37 @@ class Scraper:
         }
        
     def close(self):
-        self.session.close()
+        if self.fetcher is not None:
+            self.fetcher.close()
+            self.fetcher = None
+        self.cache.evict()
+
+    def get_fetcher(self):
+        if self.fetcher is None:
+            self.fetcher = AsyncFetcher(
+                headers=self.headers,
+                cookie_source=self.get_session_cookies,
+                concurrency=self.concurrency,
+                rate_limiter=self.rate_limiter,
+                cache=self.cache
+            )
+        return self.fetcher
+
+    def get_session_cookies(self, blocked=None):
+        """Return (session, cookies, user_agent) from a pooled session; pass that session back as `blocked` after a 403.
+
+        Cloudflare ties the clearance cookies to the User-Agent that earned them, so both are handed over together.
+        """
+        if blocked is not None:
+            self.session_pool.report(blocked, status_code=403)
+        pooled = self.session_pool.lease()
+        try:
+            return pooled, pooled.session.cookies.copy(), pooled.session.headers.get('User-Agent')
+        finally:
+            self.session_pool.release(pooled)
+
+    def get_detail_headers(self):
+        return {'Referer': 'https://www.zimmo.be/'}
         
     def get_user_agent(self):
         return self.ua.random
@@ -59,23 +94,31 @@ class Scraper:
     def open_page(self, url):
         max_retries = 3
         for attempt in range(max_retries):
+            pooled = self.session_pool.lease()
+            status_code = None
             try:
                 headers = self.headers.copy()
-                headers['User-Agent'] = self.get_user_agent()
+                headers['User-Agent'] = pooled.session.headers.get('User-Agent', headers['User-Agent'])
+                if attempt == 0:
+                    headers.update(self.cache.conditional_headers(url))
                 
-                time.sleep(random.uniform(2, 5))
+                self.rate_limiter.acquire(url)
                 
-                response = self.session.get(
+                response = pooled.session.get(
                     url, 
                     headers=headers,
                     timeout=30,
                     allow_redirects=True,
                     stream=False
                 )
+                status_code = response.status_code
                 
+                if response.status_code in (200, 304):
+                    cached = self.cache.store(url, response.status_code, response.headers, response.content)
+                    if cached is not None:
+                        return self.extractor.parse(cached.body)
                 if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    return soup
+                    return self.extractor.parse(response.content)
                 elif response.status_code == 403:
                     print(f"🚫 403 Forbidden on attempt {attempt + 1} for {url}")
                     if attempt < max_retries - 1:
@@ -92,9 +135,11 @@ class Scraper:
                 if attempt < max_retries - 1:
                     time.sleep(random.uniform(5, 10))
                     continue
+            finally:
+                self.session_pool.release(pooled, status_code)
                     
         print(f"❌ Failed to reach {url} after {max_retries} attempts")
-        return False
+        return None
      
     def update_page_number(self, page_number, url):
         if page_number == 1:
@@ -103,69 +148,81 @@ class Scraper:
             return f"{url}&p={page_number}"
         
     def get_links(self, soup):
-        properties_url = []
-        properties = soup.find_all("div", class_="property-item")
-        for listing in properties:
-            a_elem = listing.find("a", href=True)
-            if a_elem and a_elem.get('href'):
-                properties_url.append(a_elem['href'])
-        return properties_url
+        return [
+            (href, Retriever.get_zimmo_code_from_url(href))
+            for href in self.extractor.get_hrefs(soup)
+        ]
+
+    def get_result_count(self, soup):
+        return self.extractor.get_result_count(soup)
+
+    def get_known_codes(self, links):
+        codes = [code for _, code in links if code]
+        if self.known_index is not None:
+            known = self.known_index.filter_known(codes)
+        else:
+            known = self.output.get_existing_codes(codes, refresh_days=self.refresh_days) if codes else set()
+            self.unknown_codes.update(set(codes) - known)
+        return known | (set(codes) & self.seen_zimmo_code)
+
+    def filter_new_links(self, links, known=None):
+        if known is None:
+            known = self.get_known_codes(links)
+        new_links = [href for href, code in links if not (code and code in known)]
+
+        skipped = len(links) - len(new_links)
+        if skipped:
+            print(f"⏭️ Skipped {skipped} recently seen listings before download")
+        return new_links
     
     def scrape_property(self, link):
-        full_link = urljoin("https://www.zimmo.be", link)
-        if full_link in self.seen_url:
-            print(f"❌ Skipped {full_link} ")
-            return
-        
-        self.seen_url.add(full_link)
-        
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                headers = self.headers.copy()
-                headers['User-Agent'] = self.get_user_agent()
-                headers['Referer'] = 'https://www.zimmo.be/'
-                
-                time.sleep(random.uniform(2, 4))
-                
-                response = self.session.get(
-                    full_link, 
-                    headers=headers, 
-                    verify=certifi.where(),
-                    timeout=30,
-                    allow_redirects=True
-                )
-                
-                if response.status_code == 200:
-                    return response.content
-                elif response.status_code == 403:
-                    print(f"🚫 403 Forbidden on attempt {attempt + 1} for {full_link}")
-                    if attempt < max_retries - 1:
-                        time.sleep(random.uniform(5, 10))
-                        continue
-                else:
-                    print(f"{response.status_code} : ❌ Failed to fetch {full_link}")
-                    if attempt < max_retries - 1:
-                        time.sleep(random.uniform(3, 6))
-                        continue
-                        
-            except (RemoteDisconnected, requests.exceptions.RequestException) as e:
-                print(f"🔌 Connection error on attempt {attempt + 1} for {full_link}: {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(random.uniform(5, 10))
-                    continue
-        
-        print(f"❌ Failed to fetch {full_link} after {max_retries} attempts")
-        return None
+        fetched = self.scrape_properties([link])
+        return fetched[0][1] if fetched else None
+
+    def claim_links(self, links):
+        pending = []
+        for link in links:
+            full_link = urljoin("https://www.zimmo.be", link)
+            if full_link in self.seen_url:
+                print(f"❌ Skipped {full_link} ")
+                continue
+            self.seen_url.add(full_link)
+            pending.append((link, full_link))
+        return pending
+
+    def scrape_properties(self, links):
+        pending = self.claim_links(links)
+        responses = self.get_fetcher().fetch_all(
+            [full_link for _, full_link in pending],
+            headers_factory=self.get_detail_headers
+        )
+
+        fetched = []
+        for (link, full_link), response in zip(pending, responses):
+            if response is not None and response.unchanged:
+                print(f"♻️ Unchanged since last run, skipped parsing: {full_link}")
+                continue
+            fetched.append((link, response.body if response is not None else None))
+        return fetched
+
+    def mark_processed(self, links):
+        self.cache.mark_processed([urljoin("https://www.zimmo.be", link) for link in links])
     
+    def is_known(self, zimmo_code):
+        if self.known_index is not None:
+            return zimmo_code in self.known_index
+        if zimmo_code in self.unknown_codes:
+            return False
+        return self.output.exists(zimmo_code, refresh_days=self.refresh_days)
+
     def process_soup(self, raw_html, link):
         full_link = urljoin("https://www.zimmo.be", link)
         if raw_html is None:
             print(f"No HTML content received from {full_link}")
             return None
         
-        soup = BeautifulSoup(raw_html, "html.parser")
-        retrieve = Retriever(soup)
+        doc = self.extractor.parse(raw_html)
+        retrieve = self.extractor.retriever(doc, full_link)
         
         # get zimmo code
         zimmo_code = retrieve.get_zimmo_code()
@@ -173,8 +230,8 @@ class Scraper:
             print(f"⚠️ Skipped property with missing zimmo_code: {retrieve.url}")
             return
         cleaned_zimmo_code = Cleaner.clean_zimmo_code(zimmo_code) if zimmo_code else None
-        if self.output.exists(cleaned_zimmo_code):
-            print(f"⚠️ Skipping {cleaned_zimmo_code}: already in DB")
+        if self.is_known(cleaned_zimmo_code):
+            print(f"⚠️ Skipping {cleaned_zimmo_code}: already in DB and seen recently")
             return None
 
         if cleaned_zimmo_code in self.seen_zimmo_code:
@@ -226,5 +283,6 @@ class Scraper:
             data.setdefault(key, None)
         
         data = Cleaner.cleaned_data(data)
+        data["fingerprint"] = Cleaner.fingerprint(data)
         print(data)
         return cleaned_zimmo_code, data
\ No newline at end of file
@@ -0,0 +1,139 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+import cloudscraper
+from utils.rate_limiter import RateLimiter
+from utils.config import (
+    SESSION_POOL_SIZE, SESSION_MAX_REQUESTS, SESSION_MAX_AGE, SESSION_WARMUP_URL, SESSION_LEASE_TIMEOUT
+)
+
+
+class PooledSession:
+    def __init__(self, session):
+        self.session = session
+        self.created_at = time.time()
+        self.requests = 0
+        self.blocked = False
+
+    def record(self, status_code):
+        self.requests += 1
+        if status_code == 403:
+            self.blocked = True
+
+
+class SessionPool:
+    """Bounded pool of warmed-up cloudscraper sessions that workers lease and return."""
+
+    _shared_pool = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, size=SESSION_POOL_SIZE, max_requests=SESSION_MAX_REQUESTS,
+                 max_age=SESSION_MAX_AGE, rate_limiter=None):
+        self.size = size
+        self.max_requests = max_requests
+        self.max_age = max_age
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.available = queue.LifoQueue()
+        self.lock = threading.Lock()
+        self.created = 0
+
+    @classmethod
+    def shared(cls):
+        with cls._shared_lock:
+            if cls._shared_pool is None:
+                cls._shared_pool = cls()
+            return cls._shared_pool
+
+    def create_session(self):
+        session = cloudscraper.create_scraper(
+            browser={
+                'browser': 'firefox',
+                'platform': 'linux',
+                'mobile': False
+            },
+            delay=10,
+            debug=False
+        )
+        pooled = PooledSession(session)
+        try:
+            self.rate_limiter.acquire(SESSION_WARMUP_URL)
+            response = session.get(SESSION_WARMUP_URL, timeout=30)
+            pooled.record(response.status_code)
+        except Exception as e:
+            print(f"⚠️ Session warm-up failed: {e}")
+        return pooled
+
+    def is_healthy(self, pooled):
+        return (
+            not pooled.blocked
+            and pooled.requests < self.max_requests
+            and time.time() - pooled.created_at < self.max_age
+        )
+
+    def lease(self, timeout=SESSION_LEASE_TIMEOUT):
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            try:
+                pooled = self.available.get_nowait()
+            except queue.Empty:
+                with self.lock:
+                    can_create = self.created < self.size
+                    if can_create:
+                        self.created += 1
+                if can_create:
+                    try:
+                        return self.create_session()
+                    except Exception:
+                        with self.lock:
+                            self.created -= 1
+                        raise
+                remaining = max(0, deadline - time.monotonic()) if deadline is not None else None
+                try:
+                    pooled = self.available.get(timeout=remaining)
+                except queue.Empty:
+                    raise TimeoutError(f"No pooled session became free within {timeout}s") from None
+
+            if self.is_healthy(pooled):
+                return pooled
+            self.discard(pooled)
+
+    def release(self, pooled, status_code=None):
+        if status_code is not None:
+            pooled.record(status_code)
+        if self.is_healthy(pooled):
+            self.available.put(pooled)
+        else:
+            if pooled.blocked:
+                print("♻️ Recycling blocked session")
+            self.discard(pooled)
+
+    def report(self, pooled, status_code):
+        """Record a response for a session that is no longer leased, e.g. a 403 seen with its cookies.
+
+        An unhealthy session is dropped when it is next leased or released.
+        """
+        pooled.record(status_code)
+
+    def discard(self, pooled):
+        try:
+            pooled.session.close()
+        finally:
+            with self.lock:
+                self.created -= 1
+
+    @contextmanager
+    def session(self):
+        pooled = self.lease()
+        try:
+            yield pooled
+        finally:
+            self.release(pooled)
+
+    def close_all(self):
+        while True:
+            try:
+                pooled = self.available.get_nowait()
+            except queue.Empty:
+                break
+            self.discard(pooled)
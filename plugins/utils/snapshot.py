@@ -0,0 +1,49 @@
+import os
+import pyarrow as pa
+import pyarrow.parquet as pq
+from utils.config import SNAPSHOT_PATH, SNAPSHOT_COMPRESSION
+
+SNAPSHOT_SCHEMA = pa.schema([
+    ("id", pa.int32()),
+    ("zimmo_code", pa.string()),
+    ("type", pa.string()),
+    ("sub_type", pa.string()),
+    ("price", pa.decimal128(15, 2)),
+    ("street", pa.string()),
+    ("number", pa.string()),
+    ("postcode", pa.string()),
+    ("city", pa.string()),
+    ("living_area_m2", pa.decimal128(10, 2)),
+    ("ground_area_m2", pa.decimal128(10, 2)),
+    ("bedroom", pa.int32()),
+    ("bathroom", pa.int32()),
+    ("garage", pa.int32()),
+    ("garden", pa.bool_()),
+    ("epc_kwh_m2", pa.decimal128(10, 2)),
+    ("renovation_obligation", pa.bool_()),
+    ("year_built", pa.int32()),
+    ("mobiscore", pa.decimal128(4, 1)),
+    ("url", pa.string()),
+    ("scraped_at", pa.timestamp("us")),
+    ("created_at", pa.timestamp("us")),
+    ("updated_at", pa.timestamp("us")),
+    ("fingerprint", pa.string()),
+])
+
+
+def export_snapshot(output, table_name="zimmo_listings", path=SNAPSHOT_PATH, compression=SNAPSHOT_COMPRESSION):
+    """Write the table to a Parquet file with SNAPSHOT_SCHEMA, streaming it in chunks, and swap it in atomically."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    rows = 0
+    with pq.ParquetWriter(tmp_path, SNAPSHOT_SCHEMA, compression=compression) as writer:
+        for chunk in output.iter_db(table_name=table_name, columns=SNAPSHOT_SCHEMA.names, order_by="id"):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=SNAPSHOT_SCHEMA, preserve_index=False))
+            rows += len(chunk)
+    os.replace(tmp_path, path)
+    print(f"🧊 Exported {rows} rows from '{table_name}' to {path}")
+    return rows
+
+
+def read_snapshot(columns=None, path=SNAPSHOT_PATH):
+    return pq.read_table(path, columns=columns, memory_map=True).to_pandas()
@@ -2,12 +2,13 @@ import base64
 import json
 import threading
 import logging
+from utils.config import SEARCH_SORT_NEWEST
 
 class URLgenerator:
     def __init__(self, category_type):
         self.category_type = category_type
 
-    def generate_zimmo_url(self, min_price, max_price=None):
+    def generate_zimmo_url(self, min_price, max_price=None, newest_first=False):
         query = {
             "filter": {
                 "status": {"in": ["FOR_SALE", "TAKE_OVER"]},
@@ -22,6 +23,9 @@ class URLgenerator:
         if max_price is not None:
             query["filter"]["price"]["range"]["max"] = max_price
 
+        if newest_first:
+            query["sorting"] = SEARCH_SORT_NEWEST
+
         json_query = json.dumps(query, separators=(',', ':'))
         encoded_query = base64.b64encode(json_query.encode()).decode()
         return f"https://www.zimmo.be/nl/zoeken/?search={encoded_query}"
@@ -34,11 +38,20 @@ class URLgenerator:
         yield (max_limit + 1, None)
 
     def generate_url_with_price(self, start, max_limit, step):
+        return self.generate_url_for_ranges(
+            self.generate_price_ranges_with_open_end(start, max_limit, step)
+        )
+
+    @staticmethod
+    def range_key(min_p, max_p):
+        return f"{min_p} - {max_p if max_p is not None else 'no max'}"
+
+    def generate_url_for_ranges(self, price_ranges, newest_first=False):
         urls = {}
-        for min_p, max_p in self.generate_price_ranges_with_open_end(start, max_limit, step):
-            url = self.generate_zimmo_url(min_p, max_p)
-            urls[f"{min_p} - {max_p if max_p is not None else 'no max'}"] = url
-            logging.info(f"{min_p} - {max_p if max_p is not None else 'no max'}: {url}")
+        for min_p, max_p in price_ranges:
+            url = self.generate_zimmo_url(min_p, max_p, newest_first=newest_first)
+            urls[self.range_key(min_p, max_p)] = url
+            logging.info(f"{self.range_key(min_p, max_p)}: {url}")
         return urls
 
 # # Test the fixes
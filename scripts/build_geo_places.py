@@ -0,0 +1,82 @@
+import csv
+import sys
+from pathlib import Path
+
+GEO_DIR = Path(__file__).resolve().parent.parent / "data" / "geo"
+OUTPUT_FILE = GEO_DIR / "be_places.csv"
+EXTRA_FILE = GEO_DIR / "be_places_extra.csv"
+COLUMNS = ["postcode", "name", "lat", "lon", "province", "arrondissement", "alternate_names"]
+
+# Dutch, French and English names listings may use for a place GeoNames lists under another one
+ALTERNATE_NAMES = {
+    "Aalst": ["Alost"], "Antwerpen": ["Anvers", "Antwerp"], "Arlon": ["Aarlen"], "Ath": ["Aat"],
+    "Bastogne": ["Bastenaken"], "Braine-l'Alleud": ["Eigenbrakel"], "Braine-le-Comte": ["'s-Gravenbrakel"],
+    "Brugge": ["Bruges"], "Brussels": ["Brussel", "Bruxelles"], "Diksmuide": ["Dixmude"],
+    "Enghien": ["Edingen"], "Gent": ["Gand", "Ghent"], "Geraardsbergen": ["Grammont"], "Halle": ["Hal"],
+    "Hannut": ["Hannuit"], "Huy": ["Hoei"], "Ieper": ["Ypres"], "Jodoigne": ["Geldenaken"],
+    "Kortrijk": ["Courtrai"], "La Calamine": ["Kelmis"], "La Hulpe": ["Terhulpen"], "Landen": ["Landen"],
+    "Lessines": ["Lessen"], "Leuven": ["Louvain"], "Liege": ["Luik", "Lüttich"], "Lier": ["Lierre"],
+    "Mechelen": ["Malines"], "Menen": ["Menin"], "Mons": ["Bergen"],
+    "Mouscron": ["Moeskroen"], "Namur": ["Namen"], "Nivelles": ["Nijvel"], "Ostend": ["Oostende", "Ostende"],
+    "Oudenaarde": ["Audenarde"], "Rebecq-Rognon": ["Rebecq", "Roosbeek"], "Roeselare": ["Roulers"],
+    "Ronse": ["Renaix"], "Saint-Vith": ["Sankt Vith"], "Sint-Genesius-Rode": ["Rhode-Saint-Genese"],
+    "Sint-Pieters-Voeren": ["Voeren", "Fourons"], "Sint-Truiden": ["Saint-Trond"], "Soignies": ["Zinnik"], "Tienen": ["Tirlemont"],
+    "Tongeren": ["Tongres"], "Tournai": ["Doornik"], "Tubize": ["Tubeke"], "Veurne": ["Furnes"],
+    "Vilvoorde": ["Vilvorde"], "Vise": ["Wezet"], "Waremme": ["Borgworm"], "Wavre": ["Waver"],
+    "Zoutleeuw": ["Leau"],
+}
+
+
+def read_postal_dump(path):
+    """GeoNames postal code dump (export/zip/BE.zip), tab separated, one row per postcode and place."""
+    with open(path, encoding="utf-8") as f:
+        for row in csv.reader(f, delimiter="\t"):
+            if len(row) < 11 or row[0] != "BE":
+                continue
+            yield {"postcode": row[1], "name": row[2], "lat": row[9], "lon": row[10],
+                   "province": row[5], "arrondissement": row[7], "alternate_names": ""}
+
+
+def read_places(path):
+    """GeoNames places with at least 1000 inhabitants, as lat,lon,name,admin1,admin2,cc."""
+    with open(path, encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            if row["cc"].strip() != "BE":
+                continue
+            yield {"postcode": "", "name": row["name"], "lat": row["lat"], "lon": row["lon"],
+                   "province": row["admin2"], "arrondissement": "", "alternate_names": ""}
+
+
+def read_extra(path=EXTRA_FILE):
+    """Curated rows, e.g. the Brussels communes with their postcodes, in the output format."""
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def add_alternate_names(row):
+    names = [name for name in row["alternate_names"].split("|") if name]
+    names += [name for name in ALTERNATE_NAMES.get(row["name"], []) if name not in names and name != row["name"]]
+    return {**row, "alternate_names": "|".join(names)}
+
+
+def main(source):
+    reader = read_postal_dump if source.endswith(".txt") else read_places
+    extra = read_extra()
+    covered = {(row["postcode"], row["name"]) for row in extra}
+    rows = [row for row in reader(source) if (row["postcode"], row["name"]) not in covered] + extra
+    rows = sorted(map(add_alternate_names, rows), key=lambda row: (row["postcode"], row["name"]))
+    OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(OUTPUT_FILE, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"✅ Wrote {len(rows)} Belgian places to {OUTPUT_FILE}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python scripts/build_geo_places.py <GeoNames BE.txt or places csv>")
+        sys.exit(1)
+    main(sys.argv[1])
@@ -1,4 +1,3 @@
-import os
 import sys
 import json
 import pandas as pd
@@ -13,53 +12,37 @@ from sklearn.metrics import mean_absolute_error, r2_score, mean_squared_error
 from sklearn.preprocessing import StandardScaler
 import joblib
 import warnings
-import psycopg2
-from urllib.parse import urlparse
 
-def get_connection_params():
+sys.path.insert(0, "/opt/airflow/plugins")
+
+TRAIN_COLUMNS = ["price", "living_area_m2", "ground_area_m2", "bedroom", "bathroom",
+                 "garage", "epc_kwh_m2", "year_built", "mobiscore"]
+
+def load_snapshot():
     try:
-        from airflow.models import Connection
-        conn = Connection.get_connection_from_secrets("postgres_default")
-        
-        return {
-            'host': conn.host,
-            'port': conn.port,
-            'database': conn.schema,
-            'user': conn.login,
-            'password': conn.password
-        }
+        from utils.snapshot import read_snapshot
+        df = read_snapshot(columns=TRAIN_COLUMNS)
+        print(f"Method 1 (snapshot): Successfully loaded {len(df)} rows")
+        return df
     except Exception as e:
-        print(f"Error getting Airflow connection: {e}")
-        uri = os.getenv("AIRFLOW_CONN_POSTGRES_DEFAULT")
-        if not uri:
-            raise RuntimeError("AIRFLOW_CONN_POSTGRES_DEFAULT not set")
-        
-        parsed = urlparse(uri)
-        return {
-            'host': parsed.hostname,
-            'port': parsed.port or 5432,
-            'database': parsed.path.lstrip('/'),
-            'user': parsed.username,
-            'password': parsed.password
-        }
+        print(f"Method 1 (snapshot) failed: {e}")
+        return None
 
 def load_data():
-    try:
-        conn_params = get_connection_params()
-
-        conn_string = f"host='{conn_params['host']}' port='{conn_params['port']}' dbname='{conn_params['database']}' user='{conn_params['user']}' password='{conn_params['password']}'"
-        
+    df = load_snapshot()
+    if df is not None:
+        return df
 
-        conn = psycopg2.connect(conn_string)
-        
-        df = pd.read_sql("SELECT * FROM zimmo_data", con=conn)
-        conn.close()
+    try:
+        from utils.db import ConnectionPool
+        with ConnectionPool.shared().connection() as conn:
+            df = pd.read_sql(f"SELECT {', '.join(TRAIN_COLUMNS)} FROM zimmo_listings", con=conn)
         
-        print(f"Method 2 (psycopg2): Successfully loaded {len(df)} rows")
+        print(f"Method 2 (database): Successfully loaded {len(df)} rows")
         return df
         
     except Exception as e:
-        print(f"Method 2 (psycopg2) failed: {e}")
+        print(f"Method 2 (database) failed: {e}")
         return None
     
 def preprocess_data(df):
@@ -60,6 +60,83 @@ CREATE TABLE scrape_summary (
     scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE TABLE IF NOT EXISTS zimmo_history (
+    id BIGSERIAL PRIMARY KEY,
+    zimmo_code VARCHAR(255) NOT NULL,
+    fingerprint VARCHAR(32) NOT NULL,
+    price DECIMAL(15, 2),
+    attributes JSONB,
+    valid_from TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE OR REPLACE VIEW zimmo_price_changes AS
+SELECT zimmo_code, valid_from, previous_price, price, price - previous_price AS price_change
+FROM (
+    SELECT zimmo_code, valid_from, price,
+           LAG(price) OVER (PARTITION BY zimmo_code ORDER BY valid_from, id) AS previous_price
+    FROM zimmo_history
+) versions
+WHERE previous_price IS NOT NULL AND price IS DISTINCT FROM previous_price;
+
+CREATE TABLE IF NOT EXISTS zimmo_duplicates (
+    zimmo_code VARCHAR(255) PRIMARY KEY,
+    canonical_code VARCHAR(255) NOT NULL,
+    score DECIMAL(4,3),
+    detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS dedup_state (
+    table_name VARCHAR(100) PRIMARY KEY,
+    last_updated_at TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS dashboard_aggregates (
+    dimension VARCHAR(20) NOT NULL,
+    group_key VARCHAR(255) NOT NULL,
+    n BIGINT NOT NULL DEFAULT 0,
+    price_sum NUMERIC NOT NULL DEFAULT 0,
+    price_sum_sq NUMERIC NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (dimension, group_key)
+);
+
+CREATE TABLE IF NOT EXISTS dashboard_aggregates_sketch (
+    dimension VARCHAR(20) NOT NULL,
+    group_key VARCHAR(255) NOT NULL,
+    metric VARCHAR(20) NOT NULL,
+    bucket INTEGER NOT NULL,
+    n BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (dimension, group_key, metric, bucket)
+);
+
+CREATE TABLE IF NOT EXISTS dashboard_aggregates_state (
+    aggregates_table VARCHAR(100) PRIMARY KEY,
+    seeded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS crawl_watermark (
+    category_type VARCHAR(100),
+    price_range VARCHAR(100),
+    last_zimmo_code VARCHAR(255),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (category_type, price_range)
+);
+
+CREATE TABLE IF NOT EXISTS crawl_frontier (
+    run_key VARCHAR(255) NOT NULL,
+    category_type VARCHAR(100) NOT NULL,
+    kind VARCHAR(20) NOT NULL,
+    url TEXT NOT NULL,
+    price_range VARCHAR(100),
+    page INTEGER,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    properties INTEGER DEFAULT 0,
+    attempts INTEGER DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (run_key, category_type, kind, url)
+);
+
 
 CREATE INDEX IF NOT EXISTS idx_zimmo_city ON zimmo_data(city);
 CREATE INDEX IF NOT EXISTS idx_zimmo_price ON zimmo_data(price);
@@ -67,6 +144,81 @@ CREATE INDEX IF NOT EXISTS idx_zimmo_type ON zimmo_data(type);
 CREATE INDEX IF NOT EXISTS idx_zimmo_sub_type ON zimmo_data(sub_type);
 CREATE INDEX IF NOT EXISTS idx_zimmo_postcode ON zimmo_data(postcode);
 CREATE INDEX IF NOT EXISTS idx_zimmo_scraped_at ON zimmo_data(scraped_at);
+CREATE INDEX IF NOT EXISTS idx_zimmo_updated_at ON zimmo_data(updated_at);
+CREATE INDEX IF NOT EXISTS idx_zimmo_duplicates_canonical ON zimmo_duplicates(canonical_code);
+CREATE INDEX IF NOT EXISTS idx_zimmo_history_code ON zimmo_history(zimmo_code, valid_from);
+CREATE INDEX IF NOT EXISTS idx_crawl_frontier_updated_at ON crawl_frontier(category_type, updated_at);
 
 ALTER TABLE zimmo_data
-ALTER COLUMN number TYPE VARCHAR(50);
\ No newline at end of file
+ALTER COLUMN number TYPE VARCHAR(50);
+
+ALTER TABLE zimmo_data ADD COLUMN IF NOT EXISTS fingerprint VARCHAR(32);
+ALTER TABLE zimmo_data_sample ADD COLUMN IF NOT EXISTS fingerprint VARCHAR(32);
+
+CREATE OR REPLACE VIEW zimmo_listings AS
+SELECT d.*
+FROM zimmo_data d
+WHERE NOT EXISTS (
+    SELECT 1 FROM zimmo_duplicates x WHERE x.zimmo_code = d.zimmo_code
+);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS zimmo_stats_city AS
+SELECT COALESCE(city, 'unknown') AS city,
+       COUNT(*) AS listings,
+       AVG(price) AS avg_price,
+       percentile_cont(0.5) WITHIN GROUP (ORDER BY price) AS median_price,
+       MIN(price) AS min_price,
+       MAX(price) AS max_price,
+       percentile_cont(0.5) WITHIN GROUP (ORDER BY price / NULLIF(living_area_m2, 0)) AS median_price_per_m2
+FROM zimmo_listings
+GROUP BY 1;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS zimmo_stats_postcode AS
+SELECT COALESCE(postcode, 'unknown') AS postcode,
+       COUNT(*) AS listings,
+       AVG(price) AS avg_price,
+       percentile_cont(0.5) WITHIN GROUP (ORDER BY price) AS median_price,
+       MIN(price) AS min_price,
+       MAX(price) AS max_price,
+       percentile_cont(0.5) WITHIN GROUP (ORDER BY price / NULLIF(living_area_m2, 0)) AS median_price_per_m2
+FROM zimmo_listings
+GROUP BY 1;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS zimmo_stats_type AS
+SELECT COALESCE(type, 'unknown') AS type,
+       COALESCE(sub_type, 'unknown') AS sub_type,
+       COUNT(*) AS listings,
+       AVG(price) AS avg_price,
+       percentile_cont(0.5) WITHIN GROUP (ORDER BY price) AS median_price,
+       MIN(price) AS min_price,
+       MAX(price) AS max_price,
+       percentile_cont(0.5) WITHIN GROUP (ORDER BY price / NULLIF(living_area_m2, 0)) AS median_price_per_m2
+FROM zimmo_listings
+GROUP BY 1, 2;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS zimmo_stats_price_band AS
+SELECT COALESCE(type, 'unknown') AS type,
+       (FLOOR(price / 50000) * 50000)::BIGINT AS band_min,
+       (FLOOR(price / 50000) * 50000 + 49999)::BIGINT AS band_max,
+       COUNT(*) AS listings,
+       AVG(living_area_m2) AS avg_living_area_m2,
+       percentile_cont(0.5) WITHIN GROUP (ORDER BY price / NULLIF(living_area_m2, 0)) AS median_price_per_m2
+FROM zimmo_listings
+WHERE price IS NOT NULL
+GROUP BY 1, 2, 3;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS zimmo_stats_daily AS
+SELECT COALESCE(scraped_at::DATE, DATE '1970-01-01') AS scrape_day,
+       COALESCE(type, 'unknown') AS type,
+       COUNT(*) AS listings,
+       AVG(price) AS avg_price,
+       percentile_cont(0.5) WITHIN GROUP (ORDER BY price) AS median_price,
+       percentile_cont(0.5) WITHIN GROUP (ORDER BY price / NULLIF(living_area_m2, 0)) AS median_price_per_m2
+FROM zimmo_listings
+GROUP BY 1, 2;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_zimmo_stats_city ON zimmo_stats_city(city);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_zimmo_stats_postcode ON zimmo_stats_postcode(postcode);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_zimmo_stats_type ON zimmo_stats_type(type, sub_type);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_zimmo_stats_price_band ON zimmo_stats_price_band(type, band_min);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_zimmo_stats_daily ON zimmo_stats_daily(scrape_day, type);
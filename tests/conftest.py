@@ -0,0 +1,29 @@
+import os
+import sys
+import psycopg2
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "plugins"))
+
+SCHEMA_PATH = os.path.join(ROOT, "sql", "zimmo_schema.sql")
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+@pytest.fixture
+def output(monkeypatch):
+    """Output bound to a freshly created schema in TEST_DATABASE_URL."""
+    uri = os.getenv("TEST_DATABASE_URL")
+    if not uri:
+        pytest.skip("TEST_DATABASE_URL not set")
+    monkeypatch.setenv("AIRFLOW_CONN_POSTGRES_DEFAULT", uri)
+
+    conn = psycopg2.connect(uri)
+    conn.autocommit = True
+    with conn.cursor() as cur, open(SCHEMA_PATH) as f:
+        cur.execute("DROP SCHEMA public CASCADE; CREATE SCHEMA public;")
+        cur.execute(f.read())
+    conn.close()
+
+    from utils.output import Output
+    return Output()
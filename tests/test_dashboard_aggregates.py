@@ -0,0 +1,39 @@
+def aggregates(output):
+    rows = output.db.get_records("SELECT dimension, group_key, n, price_sum FROM dashboard_aggregates WHERE n <> 0")
+    return {(dimension, key): (int(n), float(total)) for dimension, key, n, total in rows}
+
+
+def test_existing_table_is_seeded_before_first_delta(output):
+    output.db.run("""
+    INSERT INTO zimmo_data (zimmo_code, type, city, price, living_area_m2, fingerprint) VALUES
+        ('A', 'HOUSE', 'Gent', 300000, 100, 'a'),
+        ('B', 'HOUSE', 'Gent', 400000, 150, 'b'),
+        ('C', 'APARTMENT', 'Leuven', 250000, 80, 'c')
+    """)
+
+    output.save_to_db({
+        "A": {"type": "HOUSE", "city": "Gent", "price": 320000, "living_area_m2": 100},
+        "D": {"type": "APARTMENT", "city": "Leuven", "price": 200000, "living_area_m2": 70},
+    })
+
+    assert aggregates(output) == {
+        ("all", ""): (4, 1170000.0),
+        ("type", "HOUSE"): (2, 720000.0),
+        ("type", "APARTMENT"): (2, 450000.0),
+        ("city", "Gent"): (2, 720000.0),
+        ("city", "Leuven"): (2, 450000.0),
+    }
+    assert output.db.get_records("SELECT DISTINCT dimension FROM dashboard_aggregates_sketch") == [("all",)]
+    stats = output.get_dashboard_stats()
+    assert stats["count"] == 4
+    assert stats["avg"] == 292500.0
+
+
+def test_seeding_happens_once(output):
+    output.db.run("INSERT INTO zimmo_data (zimmo_code, price, fingerprint) VALUES ('A', 100000, 'a')")
+    output.get_dashboard_stats()
+    output.db.run("INSERT INTO zimmo_data (zimmo_code, price, fingerprint) VALUES ('B', 100000, 'b')")
+
+    assert output.get_dashboard_stats()["count"] == 1
+    output.rebuild_dashboard_aggregates()
+    assert output.get_dashboard_stats()["count"] == 2
@@ -0,0 +1,43 @@
+from utils.deduplicator import NearDuplicateDetector
+
+
+def listing(zimmo_code, listing_id, street="Kerkstraat", number="12"):
+    return {"id": listing_id, "zimmo_code": zimmo_code, "street": street, "number": number,
+            "living_area_m2": 95, "price": 285000, "ground_area_m2": 120, "bedroom": 2,
+            "sub_type": "APARTMENT"}
+
+
+def test_identical_attributes_without_address_match_are_not_duplicates():
+    detector = NearDuplicateDetector(None)
+    pairs = [
+        (listing("A", 1), listing("B", 2, number="14")),
+        (listing("C", 3, street=None), listing("D", 4, street=None)),
+    ]
+
+    assert all(detector.score(a, b) == 0.65 for a, b in pairs)
+    matches, _ = detector.find_matches(pairs)
+    assert matches == {}
+
+
+def test_same_address_and_attributes_is_a_duplicate():
+    detector = NearDuplicateDetector(None)
+
+    matches, ids = detector.find_matches([(listing("B", 2), listing("A", 1, street="kerkstraat "))])
+
+    assert matches == {("A", "B"): 1.0}
+    assert ids == {"A": 1, "B": 2}
+
+
+def test_candidates_are_blocked_on_address(output):
+    output.db.run("""
+    INSERT INTO zimmo_data (zimmo_code, type, sub_type, postcode, street, number, living_area_m2, price, fingerprint)
+    VALUES
+        ('A', 'APARTMENT', 'APARTMENT', '9000', 'Kerkstraat', '12', 95, 285000, 'a'),
+        ('B', 'APARTMENT', 'APARTMENT', '9000', ' kerkstraat', '12 ', 96, 285000, 'b'),
+        ('C', 'APARTMENT', 'APARTMENT', '9000', 'Kerkstraat', '14', 95, 285000, 'c'),
+        ('D', 'APARTMENT', 'APARTMENT', '9000', NULL, NULL, 95, 285000, 'd')
+    """)
+
+    pairs = output.get_duplicate_candidates(None)
+
+    assert sorted((a["zimmo_code"], b["zimmo_code"]) for a, b in pairs) == [("A", "B"), ("B", "A")]
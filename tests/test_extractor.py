@@ -0,0 +1,65 @@
+import os
+import pytest
+from bs4.dammit import UnicodeDammit
+from conftest import FIXTURES_DIR
+from utils.extractor import SoupExtractor, LxmlExtractor
+
+pytest.importorskip("lxml")
+
+URL = "https://www.zimmo.be/nl/gent-9000/te-koop/huis/LK4T2/"
+FIXTURES = sorted(name for name in os.listdir(FIXTURES_DIR) if name.endswith(".html"))
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+
+def extract(extractor, raw_html):
+    doc = extractor.parse(raw_html)
+    retrieve = extractor.retriever(doc, URL)
+    return {
+        "zimmo_code": retrieve.get_zimmo_code(),
+        "features": retrieve.get_feature_info(),
+        "mobiscore": retrieve.get_mobiscore(),
+        "hrefs": extractor.get_hrefs(doc),
+        "result_count": extractor.get_result_count(doc),
+    }
+
+
+@pytest.mark.parametrize("name", FIXTURES)
+@pytest.mark.parametrize("as_text", [False, True])
+def test_lxml_matches_soup(name, as_text):
+    raw_html = read_fixture(name)
+    if as_text:
+        raw_html = UnicodeDammit(raw_html, is_html=True).unicode_markup
+
+    assert extract(LxmlExtractor(), raw_html) == extract(SoupExtractor(), raw_html)
+
+
+def test_reference_values():
+    detail = extract(LxmlExtractor(), read_fixture("detail_section.html"))
+    assert detail["zimmo_code"] == "LK4T2"
+    assert detail["features"]["woonopp."] == "145 m²"
+    assert detail["features"]["garage"] is None
+    assert detail["mobiscore"] == "8.2"
+
+    latin1 = extract(LxmlExtractor(), read_fixture("detail_latin1.html"))
+    assert latin1["features"]["ligging"] == "Liège, Rue de l'Église 4"
+
+    search = extract(LxmlExtractor(), read_fixture("search_results.html"))
+    assert search["hrefs"] == ["/nl/gent-9000/te-koop/huis/LK4T2/", "/nl/leuven-3000/te-koop/appartement/QX81B/"]
+    assert search["result_count"] == 1234
+    assert extract(LxmlExtractor(), read_fixture("search_h1.html"))["result_count"] == 12345
+
+
+def test_empty_body_parses_to_empty_document():
+    for raw_html in (b"", "   \n", read_fixture("empty.html")):
+        result = extract(LxmlExtractor(), raw_html)
+        assert result == extract(SoupExtractor(), raw_html)
+        assert result["features"] is None and result["hrefs"] == []
+
+
+def test_result_count_needs_one_class_token_with_both_words():
+    for extractor in (SoupExtractor(), LxmlExtractor()):
+        assert extract(extractor, read_fixture("search_split_classes.html"))["result_count"] == 87
@@ -0,0 +1,24 @@
+import os
+import pandas as pd
+from utils.geo import GeoAggregator
+
+PLACES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "geo", "be_places.csv")
+
+
+def test_brussels_communes_and_alternate_names_are_located():
+    listings = pd.DataFrame({
+        "postcode": ["1000", "1050", "1180", "4000", "2000"],
+        "city": ["Brussel", "Elsene", "Ukkel", "Luik", "Anvers"],
+        "price": [350000, 420000, 510000, 210000, 300000],
+        "living_area_m2": [90, 110, 140, 100, 95],
+    })
+
+    postcodes, regions = GeoAggregator(PLACES_PATH).aggregate(listings)
+
+    located = postcodes.set_index("postcode")
+    assert located["lat"].notna().all()
+    assert located.loc["1050", "place"] == "Ixelles"
+    assert located.loc["4000", "place"] == "Liege"
+    assert located.loc["2000", "place"] == "Antwerpen"
+    assert regions["arrondissement"]["arrondissement"].tolist() == ["Bruxelles-Capitale"]
+    assert regions["arrondissement"]["count"].tolist() == [3]
@@ -0,0 +1,40 @@
+def listing(price):
+    return {"Z1": {"zimmo_code": "Z1", "type": "HOUSE", "price": price, "city": "Gent",
+                   "postcode": "9000", "living_area_m2": 120, "scraped_at": "2026-10-01T10:00:00"}}
+
+
+def test_price_change_appends_history_version(output):
+    output.save_to_db(listing(300000))
+    output.save_to_db(listing(300000))
+    counts = output.save_to_db(listing(315000))
+
+    assert counts["updated"] == 1
+    history = output.db.get_records("SELECT price FROM zimmo_history WHERE zimmo_code = 'Z1' ORDER BY valid_from, price")
+    assert [float(price) for price, in history] == [300000, 315000]
+    changes = output.db.get_records("SELECT previous_price, price FROM zimmo_price_changes WHERE zimmo_code = 'Z1'")
+    assert [(float(old), float(new)) for old, new in changes] == [(300000, 315000)]
+
+
+def test_unchanged_listing_is_touched_at_most_once_per_interval(output):
+    output.save_to_db(listing(300000))
+    output.db.run("UPDATE zimmo_data SET scraped_at = '2026-09-01T10:00:00'")
+    output.save_to_db(listing(300000))
+    row = output.db.get_first("SELECT ctid, scraped_at FROM zimmo_data WHERE zimmo_code = 'Z1'")
+
+    later = listing(300000)
+    later["Z1"]["scraped_at"] = "2026-10-01T18:00:00"
+    output.save_to_db(later)
+
+    assert str(row[1]) == "2026-10-01 10:00:00"
+    assert output.db.get_first("SELECT ctid, scraped_at FROM zimmo_data WHERE zimmo_code = 'Z1'") == row
+
+
+def test_mark_seen_brings_stale_listing_back_into_refresh_window(output):
+    output.save_to_db(listing(300000))
+    output.db.run("UPDATE zimmo_data SET scraped_at = LOCALTIMESTAMP - interval '30 days', "
+                  "updated_at = LOCALTIMESTAMP - interval '30 days'")
+    assert output.get_existing_codes(["Z1"], refresh_days=7) == set()
+
+    assert output.mark_seen(["Z1", "UNKNOWN"]) == 1
+    assert output.mark_seen(["Z1"]) == 0
+    assert output.get_existing_codes(["Z1"], refresh_days=7) == {"Z1"}
@@ -0,0 +1,22 @@
+from utils.price_partitioner import PricePartitioner
+
+
+def test_cap_merges_emptiest_neighbours_without_dropping_ranges(tmp_path):
+    partitioner = PricePartitioner("HOUSE", state_dir=str(tmp_path), max_ranges=3)
+    ranges = [[0, 99, 500], [100, 199, 10], [200, 299, 20], [300, 399, 400], [400, None, 3]]
+
+    capped = partitioner.cap(ranges)
+
+    assert capped == [[0, 99, 500], [100, 299, 30], [300, None, 403]]
+
+
+def test_plan_stays_within_cap_and_covers_all_prices(tmp_path):
+    counts = iter(range(1, 100))
+    partitioner = PricePartitioner("HOUSE", probe=lambda low, high: next(counts) * 10,
+                                   state_dir=str(tmp_path), min_results=0, max_ranges=10)
+
+    plan = partitioner.plan()
+
+    assert len(plan) == 10
+    assert plan[0][0] == 0 and plan[-1][1] is None
+    assert all(high + 1 == low for (_, high), (low, _) in zip(plan, plan[1:]))
@@ -0,0 +1,112 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from utils.rate_limiter import RateLimiter
+from utils.response_cache import ResponseCache
+
+httpx = pytest.importorskip("httpx")
+from utils.async_fetcher import AsyncFetcher  # noqa: E402
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Serves self.server.pages, answering conditional requests with 304 like zimmo.be does."""
+
+    def do_GET(self):
+        body, etag, last_modified = self.server.pages[self.path]
+        self.server.requests.append((self.path, dict(self.headers)))
+        if (etag and self.headers.get("If-None-Match") == etag) or \
+                (last_modified and self.headers.get("If-Modified-Since") == last_modified):
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        if etag:
+            self.send_header("ETag", etag)
+        if last_modified:
+            self.send_header("Last-Modified", last_modified)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    server.pages = {}
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def fetch(tmp_path, server):
+    cache = ResponseCache(cache_dir=str(tmp_path / "cache"))
+    fetcher = AsyncFetcher(
+        rate_limiter=RateLimiter(state_dir=str(tmp_path / "rate"), limits={"127.0.0.1": {"rate": 1000, "burst": 1000}}),
+        cache=cache
+    )
+
+    def fetch(path):
+        return fetcher.fetch_all([f"http://127.0.0.1:{server.server_port}{path}"])[0]
+
+    fetch.cache = cache
+    fetch.url = lambda path: f"http://127.0.0.1:{server.server_port}{path}"
+    yield fetch
+    fetcher.close()
+
+
+def test_revalidates_with_etag_and_last_modified(server, fetch):
+    server.pages["/etag"] = (b"<html>etag</html>", '"v1"', None)
+    server.pages["/modified"] = (b"<html>modified</html>", None, "Wed, 01 Oct 2026 10:00:00 GMT")
+
+    for path, body in (("/etag", b"<html>etag</html>"), ("/modified", b"<html>modified</html>")):
+        first = fetch(path)
+        fetch.cache.mark_processed([fetch.url(path)])
+        second = fetch(path)
+
+        assert first.body == second.body == body
+        assert not first.unchanged and second.unchanged
+
+    sent = [headers for path, headers in server.requests[1::2]]
+    assert sent[0]["If-None-Match"] == '"v1"'
+    assert sent[1]["If-Modified-Since"] == "Wed, 01 Oct 2026 10:00:00 GMT"
+
+
+def test_changed_and_unchanged_bodies(server, fetch):
+    server.pages["/plain"] = (b"<html>same</html>", None, None)
+    fetch("/plain")
+    fetch.cache.mark_processed([fetch.url("/plain")])
+
+    assert fetch("/plain").unchanged
+
+    server.pages["/plain"] = (b"<html>new price</html>", None, None)
+    changed = fetch("/plain")
+    assert changed.body == b"<html>new price</html>" and not changed.unchanged
+    assert not fetch("/plain").unchanged
+
+
+def stored_bodies(cache):
+    return sorted(name for _, _, files in os.walk(cache.objects_dir) for name in files)
+
+
+def test_evicts_expired_and_least_recently_used_bodies(tmp_path):
+    cache = ResponseCache(cache_dir=str(tmp_path), ttl=3600, max_bytes=150)
+    shared, other, old = b"s" * 100, b"o" * 100, b"x" * 10
+    for url, body in (("a", shared), ("b", shared), ("c", other), ("old", old)):
+        cache.store(url, 200, {}, body)
+    with cache._connect() as conn:
+        conn.executemany("UPDATE entries SET accessed_at = ? WHERE url = ?", [(1, "a"), (2, "b"), (3, "c")])
+        conn.execute("UPDATE entries SET fetched_at = 0 WHERE url = 'old'")
+
+    cache.evict()
+
+    with cache._connect() as conn:
+        assert [row[0] for row in conn.execute("SELECT url FROM entries")] == ["c"]
+    assert stored_bodies(cache) == [cache.store("c", 304, {}, None).body_hash]
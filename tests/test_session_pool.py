@@ -0,0 +1,62 @@
+import pytest
+
+pytest.importorskip("cloudscraper")
+
+from utils.session_pool import PooledSession, SessionPool
+
+
+class FakeSession:
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = SessionPool(size=1)
+    monkeypatch.setattr(pool, "create_session", lambda: PooledSession(FakeSession()))
+    return pool
+
+
+def test_lease_raises_when_no_session_frees_up(pool):
+    pool.lease()
+
+    with pytest.raises(TimeoutError):
+        pool.lease(timeout=0.05)
+
+
+def test_reported_session_is_replaced_on_next_lease(pool):
+    blocked = pool.lease()
+    pool.release(blocked)
+
+    pool.report(blocked, 403)
+    fresh = pool.lease()
+
+    assert fresh is not blocked
+    assert blocked.session.closed
+    assert pool.created == 1
+
+
+def test_cookies_come_with_the_user_agent_that_earned_them(pool):
+    pytest.importorskip("httpx")
+    from utils.async_fetcher import AsyncFetcher
+    from utils.scraper import Scraper
+
+    scraper = Scraper.__new__(Scraper)
+    scraper.session_pool = pool
+    seeded = pool.lease()
+    seeded.session.cookies = {"cf_clearance": "token"}
+    seeded.session.headers = {"User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:140.0) Firefox/140.0"}
+    pool.release(seeded)
+
+    fetcher = AsyncFetcher(headers={"User-Agent": "random", "Accept": "text/html"},
+                           cookie_source=scraper.get_session_cookies)
+    try:
+        fetcher._ensure_client()
+        assert fetcher.cookie_session is seeded
+        assert fetcher.client.cookies["cf_clearance"] == "token"
+        assert fetcher.client.headers["User-Agent"] == seeded.session.headers["User-Agent"]
+        assert "User-Agent" not in scraper.get_detail_headers()
+    finally:
+        fetcher.close()